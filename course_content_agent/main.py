@@ -1,19 +1,20 @@
 import os
+import asyncio
 import logging
 import sys
-import multiprocessing as mp
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import dspy
-from typing import Optional, List
-import pickle
+from typing import Dict, Optional, List
 
 from course_content_agent.models import DocumentTree, ComplexityLevel, DocumentType
 from course_content_agent.modules import (
     RepoManager, LearningPathGenerator, CourseGenerator, CourseExporter,
-    process_single_document, process_llm_analysis
+    process_single_document, analyze_document, read_tree_cache, write_tree_cache,
+    load_tree_content, read_tree_manifest, write_tree_manifest, llm_cache_enabled,
+    classification_memo, prune_cache_dir, LLM_MAX_CONCURRENCY
 )
 
 load_dotenv()
@@ -46,34 +47,64 @@ logging.getLogger("LiteLLM").setLevel(logging.WARNING)
 # Configuration
 # =============================================================================
 # dspy.configure(lm=dspy.LM("anthropic/claude-3-5-haiku-latest", cache=False))
-dspy.configure(lm=dspy.LM("gemini/gemini-2.5-flash", cache=False, max_tokens=20000, temperature=0.))
+# DSPy's response cache makes identical predictor calls local lookups across re-runs
+# (set COURSE_AGENT_NO_CACHE=1 for fresh outputs). async_max_workers bounds the threads
+# behind dspy.asyncify; match course generation concurrency
+dspy.configure(
+    lm=dspy.LM("gemini/gemini-2.5-flash", cache=llm_cache_enabled(), max_tokens=20000, temperature=0.),
+    async_max_workers=LLM_MAX_CONCURRENCY
+)
 
 # =============================================================================
 # Course Builder
 # =============================================================================
 
 class CourseBuilder:
-    """Build courses from documentation repositories with multiprocessing"""
+    """Build courses from documentation repositories with thread-pooled I/O and async LLM calls"""
     
     def __init__(self, cache_dir: str = CACHE_DIR, max_workers: int = None):
         self.repo_manager = RepoManager(cache_dir)
-        self.learning_path_generator = LearningPathGenerator()
-        self.course_generator = CourseGenerator()
+        # Persisted LLM outputs are skipped entirely when caching is disabled
+        use_cache = llm_cache_enabled()
+        self.learning_path_generator = LearningPathGenerator(
+            cache_dir=Path(cache_dir) / "learning_paths" if use_cache else None
+        )
+        self.course_generator = CourseGenerator(
+            response_cache_dir=Path(cache_dir) / "llm_responses" if use_cache else None
+        )
         self.course_exporter = CourseExporter()
         
-        # Set max workers (default to CPU count - 1)
-        self.max_workers = max_workers or max(1, mp.cpu_count() - 1)
-        logger.info(f"Using {self.max_workers} worker processes")
+        # Bound the persisted outputs; DSPy's own disk cache enforces its own size limit
+        if use_cache:
+            for subdir in ("learning_paths", "llm_responses"):
+                removed, freed = prune_cache_dir(Path(cache_dir) / subdir)
+                if removed:
+                    logger.info(f"Pruned {removed} stale cache files ({freed / 1024 ** 2:.1f} MB) from {subdir}")
+        
+        # Keep DSPy's LM cache on disk beside the other caches so re-runs skip unchanged
+        # calls (entries are keyed on the full request); configure_cache needs DSPy >= 2.6
+        if hasattr(dspy, 'configure_cache'):
+            dspy.configure_cache(
+                enable_disk_cache=use_cache,
+                enable_memory_cache=use_cache,
+                disk_cache_dir=str(Path(cache_dir) / "dspy_lm")
+            )
+        
+        # In-flight LLM analysis calls (defaults to the course generation concurrency)
+        self.max_workers = max_workers or LLM_MAX_CONCURRENCY
+        # Document reads are I/O + C-regex bound, so threads avoid fork/pickle overhead
+        self.io_workers = min(32, (os.cpu_count() or 1) * 4)
+        logger.info(f"Using {self.max_workers} concurrent LLM requests, {self.io_workers} I/O threads")
     
     def _process_documents_parallel(self, md_files, repo_path):
-        """Process documents in parallel using multiprocessing"""
+        """Process documents in parallel using a thread pool"""
         logger.info(f"Starting parallel processing of {len(md_files)} files...")
         
-        # Prepare arguments for multiprocessing
+        # Prepare arguments for the worker pool
         args = [(file_path, repo_path, True) for file_path in md_files]
         
-        # Process with multiprocessing
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+        # Process with a thread pool (reads release the GIL, no result pickling)
+        with ThreadPoolExecutor(max_workers=self.io_workers) as executor:
             results = list(executor.map(process_single_document, args))
         
         # Log results
@@ -93,11 +124,11 @@ class CourseBuilder:
         """Process documents to extract basic content without LLM analysis"""
         logger.info(f"Processing raw content from {len(md_files)} files...")
         
-        # Prepare arguments for multiprocessing
+        # Prepare arguments for the worker pool
         args = [(file_path, tree.root_path, False) for file_path in md_files]
         
-        # Process with multiprocessing
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+        # Process with a thread pool (reads release the GIL, no result pickling)
+        with ThreadPoolExecutor(max_workers=self.io_workers) as executor:
             results = list(executor.map(process_single_document, args))
         
         # Log results
@@ -113,29 +144,57 @@ class CourseBuilder:
         
         return results
     
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters for the classification memo and the module response cache"""
+        memo = classification_memo()
+        stats = {'classification': {'hits': memo.hits, 'misses': memo.misses}}
+        response_cache = self.course_generator.response_cache
+        if response_cache is not None:
+            stats['module_responses'] = {'hits': response_cache.hits, 'misses': response_cache.misses}
+        return stats
+    
+    def _analyze_documents(self, llm_args):
+        """Run LLM analysis for each argument tuple concurrently, preserving input order"""
+        return asyncio.run(self._analyze_documents_async(llm_args))
+    
+    async def _analyze_documents_async(self, llm_args):
+        """Gather analysis tasks under a semaphore bounding in-flight LLM requests"""
+        
+        semaphore = asyncio.Semaphore(self.max_workers)
+        analyze = dspy.asyncify(analyze_document)
+        
+        async def analyze_bounded(args):
+            async with semaphore:
+                return await analyze(args)
+        
+        return list(await asyncio.gather(*(analyze_bounded(args) for args in llm_args)))
+    
     def _apply_llm_analysis(self, processed_results, tree, overview_context: str = ""):
-        """Apply LLM analysis to processed documents using parallel processing"""
+        """
+        Apply LLM analysis to processed documents using parallel processing.
+        Returns (error count, relative paths whose LLM analysis succeeded).
+        """
         
         successful_results = [r for r in processed_results if r['success']]
         
         if not successful_results:
             logger.warning("No successful results to process with LLM")
-            return 0
+            return 0, set()
         
         logger.info(f"Starting parallel LLM analysis of {len(successful_results)} documents...")
         if overview_context:
             logger.info("Using overview context for better document understanding")
         
-        # Prepare arguments for multiprocessing
+        # Prepare arguments for the worker pool
         llm_args = [(result, tree.root_path, overview_context) for result in successful_results]
         
-        # Process with multiprocessing
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-            llm_results = list(executor.map(process_llm_analysis, llm_args))
+        # LLM calls are network-bound, so they are gathered concurrently on one event loop
+        llm_results = self._analyze_documents(llm_args)
         
         # Process results and create nodes
         error_count = 0
         llm_error_count = 0
+        analyzed = set()
         
         for llm_result in llm_results:
             if not llm_result['success']:
@@ -153,6 +212,8 @@ class CourseBuilder:
                 node_data = llm_result['node_data']
                 node = DocumentNode(**node_data)
                 tree.nodes[llm_result['relative_path']] = node
+                if llm_result['llm_success']:
+                    analyzed.add(llm_result['relative_path'])
                 
             except Exception as e:
                 logger.error(f"Failed to create node for {llm_result['relative_path']}: {e}")
@@ -162,17 +223,20 @@ class CourseBuilder:
         if llm_error_count > 0:
             logger.warning(f"⚠ {llm_error_count} documents used basic metadata due to LLM failures")
         
-        return error_count
+        return error_count, analyzed
     
     def _apply_llm_analysis_batch(self, processed_results, tree, batch_size: int = 50, overview_context: str = ""):
-        """Apply LLM analysis in batches to manage memory usage"""
+        """
+        Apply LLM analysis in batches to manage memory usage.
+        Returns (error count, relative paths whose LLM analysis succeeded).
+        """
         
         successful_results = [r for r in processed_results if r['success']]
         total_docs = len(successful_results)
         
         if not successful_results:
             logger.warning("No successful results to process with LLM")
-            return 0
+            return 0, set()
         
         logger.info(f"Starting batched LLM analysis of {total_docs} documents (batch size: {batch_size})...")
         if overview_context:
@@ -180,6 +244,7 @@ class CourseBuilder:
         
         total_error_count = 0
         total_llm_error_count = 0
+        analyzed = set()
         
         # Process in batches
         for i in range(0, total_docs, batch_size):
@@ -191,9 +256,8 @@ class CourseBuilder:
             # Prepare arguments for this batch
             llm_args = [(result, tree.root_path, overview_context) for result in batch_results]
             
-            # Process batch with multiprocessing
-            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-                llm_results = list(executor.map(process_llm_analysis, llm_args))
+            # Gather the batch concurrently on one event loop
+            llm_results = self._analyze_documents(llm_args)
             
             # Process batch results
             error_count = 0
@@ -214,6 +278,8 @@ class CourseBuilder:
                     node_data = llm_result['node_data']
                     node = DocumentNode(**node_data)
                     tree.nodes[llm_result['relative_path']] = node
+                    if llm_result['llm_success']:
+                        analyzed.add(llm_result['relative_path'])
                     
                 except Exception as e:
                     logger.error(f"Failed to create node for {llm_result['relative_path']}: {e}")
@@ -228,7 +294,76 @@ class CourseBuilder:
         if total_llm_error_count > 0:
             logger.warning(f"⚠ {total_llm_error_count} documents used basic metadata due to LLM failures")
         
-        return total_error_count
+        return total_error_count, analyzed
+    
+    def _analyze_results(self, raw_results, tree, batch_size: int, overview_context: str):
+        """
+        Apply LLM analysis in batches when batch_size > 0, otherwise all at once.
+        Returns (error count, relative paths whose LLM analysis succeeded).
+        """
+        if batch_size > 0:
+            return self._apply_llm_analysis_batch(raw_results, tree, batch_size, overview_context)
+        return self._apply_llm_analysis(raw_results, tree, overview_context)
+    
+    def _update_changed_documents(self, tree, raw_results, manifest, batch_size: int,
+                                  skip_llm: bool, overview_context: str) -> Optional[Dict[str, str]]:
+        """
+        Bring a cached tree up to date with the current sources, re-analyzing only
+        documents whose content hash differs from the manifest and dropping deleted
+        ones. Returns the updated manifest if the tree changed (cached learning paths
+        are then reset), otherwise None.
+        """
+        current = {r['relative_path']: r for r in raw_results if r['success']}
+        changed = [
+            r for path, r in current.items()
+            if manifest.get(path) != r['content_hash'] or path not in tree.nodes
+        ]
+        removed = [path for path in tree.nodes if path not in current]
+        
+        if not changed and not removed:
+            logger.info("Cached document tree is up to date")
+            return None
+        
+        logger.info(f"Updating cached document tree: {len(changed)} new or changed, {len(removed)} removed documents")
+        for path in removed:
+            del tree.nodes[path]
+        analyzed = set()
+        if changed and not skip_llm:
+            _, analyzed = self._analyze_results(changed, tree, batch_size, overview_context)
+        
+        # Only documents the LLM actually re-analyzed take their new hash; skipped ones and
+        # basic-metadata fallbacks keep the old hash (or none) so the next run retries them
+        rebuilt = [r for r in changed if r['relative_path'] in analyzed]
+        if len(rebuilt) < len(changed):
+            logger.warning(f"{len(changed) - len(rebuilt)} new or changed documents were not re-analyzed and stay pending")
+        if not rebuilt and not removed:
+            return None
+        
+        updated_manifest = {path: digest for path, digest in manifest.items() if path in tree.nodes}
+        updated_manifest.update({r['relative_path']: r['content_hash'] for r in rebuilt})
+        
+        # Learning paths cluster the whole document set, so they are regenerated
+        tree.learning_paths = []
+        tree.last_updated = datetime.now()
+        return updated_manifest
+    
+    @staticmethod
+    def _built_manifest(tree, raw_results) -> Dict[str, str]:
+        """Content hashes of the documents that have a node in the tree"""
+        return {
+            r['relative_path']: r['content_hash']
+            for r in raw_results
+            if r['success'] and r['relative_path'] in tree.nodes
+        }
+    
+    def _write_tree_cache(self, tree, cache_file: Path, manifest: Dict[str, str]):
+        """Cache the processed tree together with the content hashes its nodes were built from"""
+        try:
+            write_tree_cache(tree, cache_file)
+            write_tree_manifest(cache_file, manifest)
+            logger.info(f"Cached document tree to {cache_file}")
+        except Exception as e:
+            logger.warning(f"Failed to cache document tree: {e}")
     
     def _find_overview_document(self, doc_files, overview_filename):
         """
@@ -307,7 +442,7 @@ class CourseBuilder:
                 logger.info(f"Including folders: {include_folders}")
 
             # Clone the repo
-            cloned_repo_path = self.repo_manager.clone_or_update_repo(repo_path)
+            cloned_repo_path = self.repo_manager.clone_or_update_repo(repo_path, include_folders=include_folders)
             
             # Find documentation files using existing repo manager
             doc_files = self.repo_manager.find_documentation_files(cloned_repo_path, include_folders=include_folders)
@@ -328,8 +463,8 @@ class CourseBuilder:
             tree = None
             if cache_file.exists():
                 try:
-                    with open(cache_file, 'rb') as f:
-                        tree = pickle.load(f)
+                    # Content is loaded below only for the documents that need it
+                    tree = read_tree_cache(cache_file, load_content=False)
                     logger.info(f"Loaded cached document tree with {len(tree.nodes)} nodes")
                 except Exception as e:
                     logger.warning(f"Failed to load cached tree: {e}")
@@ -358,18 +493,24 @@ class CourseBuilder:
                 
                 # Apply LLM analysis if not skipped
                 if not skip_llm:
-                    if batch_size > 0:
-                        self._apply_llm_analysis_batch(raw_results, tree, batch_size, overview_content)
-                    else:
-                        self._apply_llm_analysis(raw_results, tree, overview_content)
+                    self._analyze_results(raw_results, tree, batch_size, overview_content)
                 
                 # Cache the processed tree
-                try:
-                    with open(cache_file, 'wb') as f:
-                        pickle.dump(tree, f)
-                    logger.info(f"Cached document tree to {cache_file}")
-                except Exception as e:
-                    logger.warning(f"Failed to cache document tree: {e}")
+                self._write_tree_cache(tree, cache_file, self._built_manifest(tree, raw_results))
+            else:
+                # Re-read sources (cheap next to LLM calls) so edits since the cache was written are picked up
+                raw_results = self._process_raw_documents(doc_files, tree)
+                manifest = read_tree_manifest(cache_file)
+                if manifest is None:
+                    # Caches written before manifests existed are trusted as-is once
+                    logger.info("No content manifest for cached tree, recording current document hashes")
+                    self._write_tree_cache(tree, cache_file, self._built_manifest(tree, raw_results))
+                else:
+                    updated_manifest = self._update_changed_documents(
+                        tree, raw_results, manifest, batch_size, skip_llm, overview_content
+                    )
+                    if updated_manifest is not None:
+                        self._write_tree_cache(tree, cache_file, updated_manifest)
             
             # Generate learning paths using the new LearningPathGenerator
             # Check if learning paths already exist in cached tree
@@ -379,6 +520,9 @@ class CourseBuilder:
             else:
                 logger.info("Generating learning paths...")
                 
+                # Clustering previews every document, so all content is needed here
+                load_tree_content(tree, cache_file)
+                
                 # Set repo_name if not available
                 if not hasattr(tree, 'repo_name') or not tree.repo_name:
                     tree.repo_name = repo_name
@@ -396,14 +540,19 @@ class CourseBuilder:
                 
                 # Update cache with learning paths
                 try:
-                    with open(cache_file, 'wb') as f:
-                        pickle.dump(tree, f)
+                    write_tree_cache(tree, cache_file)
                     logger.info(f"Updated cache with learning paths: {cache_file}")
                 except Exception as e:
                     logger.warning(f"Failed to update cache with learning paths: {e}")
             
             # Generate course content for each learning path
             logger.info("Generating course content...")
+            load_tree_content(tree, cache_file, paths={
+                doc_path
+                for grouped_path in grouped_paths
+                for module in grouped_path.modules
+                for doc_path in module.documents
+            })
             course_count = 0
             
             for grouped_path in grouped_paths:
@@ -433,6 +582,7 @@ class CourseBuilder:
                 return False
                 
             logger.info(f"Course generation complete! Generated {course_count} courses in {output_path}")
+            logger.info(f"Cache stats: {self.cache_stats()}")
             return True
             
         except Exception as e:
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable
 from datetime import datetime
 from enum import Enum
 
@@ -72,6 +72,26 @@ class DocumentTree(BaseModel):
     document_categories: Dict[str, List[str]] = Field(default_factory=dict)  # Changed from DocumentType keys
     complexity_distribution: Dict[str, int] = Field(default_factory=dict)  # Changed from ComplexityLevel keys
     learning_paths: List[List[str]] = Field(default_factory=list)
+    
+    @staticmethod
+    def node_columns(nodes: Iterable[DocumentNode]) -> Dict[str, List[Any]]:
+        """
+        Build parallel per-field lists for the given nodes, for iteration-heavy
+        steps that only touch a few metadata fields. Document content is left
+        out; read it from the node when a preview is needed.
+        """
+        nodes = list(nodes)
+        metadata = [node.metadata for node in nodes]
+        return {
+            'paths': [node.path for node in nodes],
+            'filenames': [node.filename for node in nodes],
+            'titles': [m.title for m in metadata],
+            'semantic_summaries': [m.semantic_summary for m in metadata],
+            'key_concepts_lists': [m.key_concepts for m in metadata],
+            'learning_objectives_lists': [m.learning_objectives for m in metadata],
+            'primary_languages': [m.primary_language for m in metadata],
+            'headings_lists': [m.headings for m in metadata],
+        }
 
 class AssessmentPoint(BaseModel):
     """Simple assessment point within a learning module"""
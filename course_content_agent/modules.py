@@ -1,17 +1,53 @@
+import functools
+import io
 import os
+import time
+import random
+import asyncio
+import threading
 import pickle
 import hashlib
 import json
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Tuple, Union
 from pathlib import Path
 import git
 import dspy
 from urllib.parse import urlparse
 import re
-import frontmatter
+import yaml
 import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 
 
+# Optional fast JSON serialization for course export and LLM payloads
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional fast non-cryptographic hashing for cache keys and document ids
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Optional exact token counting for prompt budgets
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Optional zstd compression for document tree caches
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 from course_content_agent.models import (
     DocumentType, ComplexityLevel, DocumentMetadata, DocumentNode,
     DocumentTree, AssessmentPoint, LearningModule, GroupedLearningPath,
@@ -21,38 +57,204 @@ from course_content_agent.signatures import (
     DocumentClassifier, DocumentClusterer,
     WelcomeMessageGenerator, ModuleIntroGenerator, ModuleMainContentGenerator, 
     ModuleConclusionGenerator, ModuleSummaryGenerator, AssessmentContentGenerator, 
-    CourseConclusionGenerator
+    ModuleAllComponentsGenerator, CourseConclusionGenerator
 )
 
 logger = logging.getLogger(__name__)
 
+# Frontmatter is only handed to YAML when the leading '---' block is present;
+# prefer the libyaml C loader when it is available.
+_FRONTMATTER_RE = re.compile(r'\A---\r?\n(.*?)\r?\n---(?:\r?\n|\Z)(.*)', re.DOTALL)
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Directories never descended into during documentation discovery
+_EXCLUDED_DIRS = frozenset({
+    'node_modules', '.git', '__pycache__', '.pytest_cache',
+    'venv', 'env', '.venv', 'build', 'dist', 'tests'
+})
+
+# Common non-content files skipped during documentation discovery
+_EXCLUDED_NAME_RE = re.compile(r'^(license|contributing|code_of_conduct|security|patents)', re.IGNORECASE)
+
+_WORD_RE = re.compile(r'\S+')
+
+# Fenced code blocks (an unterminated fence runs to the end, e.g. after truncation)
+_FENCED_CODE_RE = re.compile(r'(```.*?(?:```|\Z))', re.DOTALL)
+
+# Output fields of the combined module generator
+_MODULE_COMPONENT_FIELDS = ("introduction", "main_content", "conclusion", "assessment_content", "summary")
+
+# Component files written for every exported module, in write order
+_MODULE_FILES = ("01_intro.md", "02_main.md", "03_conclusion.md", "04_assessments.md", "05_summary.md")
+
+# =============================================================================
+# Shared DSPy Predictors
+# =============================================================================
+# Built once per process and reused by every module instance instead of being
+# rebuilt on each instantiation. Predictor calls keep no per-call state on the
+# instance, so they can be shared across worker threads.
+
+_CLASSIFIER = dspy.ChainOfThought(DocumentClassifier)
+_CLUSTERER = dspy.ChainOfThought(DocumentClusterer)
+_WELCOME_GENERATOR = dspy.ChainOfThought(WelcomeMessageGenerator)
+_INTRO_GENERATOR = dspy.ChainOfThought(ModuleIntroGenerator)
+_MAIN_CONTENT_GENERATOR = dspy.ChainOfThought(ModuleMainContentGenerator)
+_CONCLUSION_GENERATOR = dspy.ChainOfThought(ModuleConclusionGenerator)
+_SUMMARY_GENERATOR = dspy.ChainOfThought(ModuleSummaryGenerator)
+_ASSESSMENT_CONTENT_GENERATOR = dspy.ChainOfThought(AssessmentContentGenerator)
+_MODULE_COMPONENTS_GENERATOR = dspy.ChainOfThought(ModuleAllComponentsGenerator)
+_COURSE_CONCLUSION_GENERATOR = dspy.ChainOfThought(CourseConclusionGenerator)
+
+def dumps_json(obj: Any) -> str:
+    """Compact JSON text, via orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+def loads_json(text: Union[str, bytes]) -> Any:
+    """Parse JSON text, via orjson when it is installed (errors are json.JSONDecodeError either way)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+@functools.lru_cache(maxsize=1)
+def _get_token_encoding():
+    """cl100k_base encoding, or None when tiktoken is missing or its BPE file cannot be loaded"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Token encoding unavailable, estimating tokens from characters: {e}")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Token count of text (estimated at 4 characters per token without tiktoken)"""
+    encoding = _get_token_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep whole paragraphs of text while they fit in max_tokens; a leading oversized paragraph is hard-cut"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    
+    kept = []
+    used = 0
+    for paragraph in text.split("\n\n"):
+        tokens = count_tokens(paragraph) + (1 if kept else 0)
+        if used + tokens > max_tokens:
+            break
+        kept.append(paragraph)
+        used += tokens
+    
+    if kept:
+        return "\n\n".join(kept)
+    
+    encoding = _get_token_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+# Per-document field caps and total payload budget for the clustering prompt
+DOCUMENT_SUMMARY_MAX_CHARS = 300
+DOCUMENT_LIST_MAX_ITEMS = 8
+DOCUMENTS_INFO_MAX_BYTES = 120_000
+
+# Token budget for the source documents sent with each module (roughly the former 15000 characters)
+SOURCE_DOCUMENTS_MAX_TOKENS = 4000
+
+def llm_cache_enabled() -> bool:
+    """LLM response caching is on unless COURSE_AGENT_NO_CACHE is set (read at call time so .env applies)"""
+    return os.getenv("COURSE_AGENT_NO_CACHE", "").strip().lower() not in ("1", "true", "yes")
+
+# Concurrent LLM requests issued by course generation
+LLM_MAX_CONCURRENCY = 32
+
+# Overview context shared by every course generation prompt is capped at this many characters
+OVERVIEW_CONTEXT_MAX_CHARS = 8000
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """True for provider 429s (litellm RateLimitError or any error carrying status 429)"""
+    return 'RateLimit' in type(error).__name__ or getattr(error, 'status_code', None) == 429
+
+def _is_transient_llm_error(error: Exception) -> bool:
+    """Rate limits, timeouts and provider 5xx responses are worth retrying"""
+    if _is_rate_limit_error(error) or isinstance(error, TimeoutError) or 'Timeout' in type(error).__name__:
+        return True
+    status_code = getattr(error, 'status_code', None)
+    return isinstance(status_code, int) and status_code >= 500
+
+def _is_output_parse_error(error: Exception) -> bool:
+    """True when the LLM answered but its output could not be parsed into the signature fields"""
+    if _is_transient_llm_error(error):
+        return False
+    return 'ParseError' in type(error).__name__ or isinstance(error, (ValueError, KeyError, AttributeError))
+
+def call_with_retry(fn, description: str, attempts: int = 3, base_delay: float = 1.0, max_delay: float = 10.0):
+    """Call fn(), retrying transient LLM errors with jittered exponential backoff"""
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == attempts or not _is_transient_llm_error(e):
+                raise
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            logger.warning(f"{description} failed (attempt {attempt}/{attempts}), retrying in {delay:.1f}s: {e}")
+            time.sleep(delay)
+
 # =============================================================================
 # Multiprocessing Helper Functions (must be at module level)
 # =============================================================================
 
+def normalize_whitespace(text: str) -> str:
+    """
+    Collapse whitespace runs so reformatting-only edits map to the same cache key.
+    Fenced code blocks are kept verbatim, since indentation there can change meaning.
+    """
+    if '```' not in text:
+        return ' '.join(text.split())
+    # split() with a capturing group alternates prose and fenced blocks
+    parts = _FENCED_CODE_RE.split(text)
+    return ' '.join(
+        part if i % 2 else ' '.join(part.split())
+        for i, part in enumerate(parts)
+        if part and (i % 2 or not part.isspace())
+    )
+
+def hash_key(text: str) -> str:
+    """Deterministic hex key for cache paths and document ids (xxh3 when available, else MD5)"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_hexdigest(text.encode())
+    return hashlib.md5(text.encode()).hexdigest()
+
 def process_single_document(args):
     """Process a single document - must be top-level function for multiprocessing"""
     file_path, repo_path, use_llm = args
+    relative_path = 'unknown'
     
     try:
-        relative_path = str(file_path.relative_to(repo_path))
+        # Plain string path ops; no intermediate PurePath objects
+        relative_path = os.path.relpath(file_path, repo_path)
         
-        # Read file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Read file (binary read + one-shot decode skips TextIOWrapper's chunked decoding)
+        with open(file_path, 'rb') as f:
+            content = f.read().decode('utf-8')
         
         # Create basic metadata
         basic_data = ContentExtractor.extract_basic_metadata(content, file_path)
         
         # For multiprocessing, we'll do LLM processing in the main thread
         # This avoids complex serialization issues with dspy modules
-        doc_id = hashlib.md5(relative_path.encode()).hexdigest()
+        doc_id = hash_key(relative_path)
         
         return {
             'success': True,
             'relative_path': relative_path,
             'doc_id': doc_id,
             'content': content,
+            'content_hash': hash_key(content),
             'basic_data': basic_data,
             'file_path': file_path
         }
@@ -60,24 +262,21 @@ def process_single_document(args):
     except Exception as e:
         return {
             'success': False,
-            'relative_path': str(file_path.relative_to(repo_path)) if file_path else 'unknown',
+            'relative_path': relative_path,
             'error': str(e)
         }
 
-def process_llm_analysis(args):
-    """Process LLM analysis for a single document - must be top-level function for multiprocessing"""
+def analyze_document(args):
+    """
+    LLM analysis for a single document using the already-configured DSPy LM.
+    Safe to run on worker threads.
+    """
     result, tree_root_path, overview_context = args
     
     try:
-        # Load environment variables and configure DSPy for this worker process (needed for multiprocessing)
-        from dotenv import load_dotenv
-        import dspy
-        load_dotenv()
-        dspy.configure(lm=dspy.LM("gemini/gemini-2.5-flash", cache=False, max_tokens=20000, temperature=0.))
-        
         relative_path = result['relative_path']
         
-        # Initialize parser module for this worker process
+        # Parser modules share the module-level classifier
         parser_module = DocumentParserModule()
         
         # Apply LLM analysis
@@ -103,8 +302,7 @@ def process_llm_analysis(args):
             'filename': result['file_path'].name,
             'content': result['content'],
             'metadata': metadata,
-            'parent_path': str(result['file_path'].parent.relative_to(Path(tree_root_path))) 
-            if result['file_path'].parent != Path(tree_root_path) else None
+            'parent_path': os.path.dirname(relative_path) or None
         }
         
         return {
@@ -139,6 +337,253 @@ def create_basic_metadata_from_result(result):
         semantic_summary=f"Documentation for {basic_data['title']}"
     )
 
+# =============================================================================
+# Document Tree Cache Helpers
+# =============================================================================
+
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Raised when decompressing a truncated or corrupt zstd frame
+_ZSTD_ERRORS = (zstandard.ZstdError,) if ZSTD_AVAILABLE else ()
+
+def _content_store_path(cache_path: Path) -> Path:
+    """Directory holding per-document content next to a tree cache file"""
+    return cache_path.with_suffix('.content')
+
+def write_tree_cache(tree: DocumentTree, cache_path: Path):
+    """
+    Write a document tree cache as two parts: node metadata pickled in one
+    (zstd-compressed when available) blob, and each node's content in its own
+    file under the content store so it can be loaded on demand. Stored content
+    of nodes no longer in the tree is deleted.
+    """
+    store = _content_store_path(cache_path)
+    store.mkdir(exist_ok=True)
+    compressor = zstandard.ZstdCompressor(level=3) if ZSTD_AVAILABLE else None
+    for node in tree.nodes.values():
+        # Nodes whose content was never loaded keep their existing stored copy
+        if not node.content:
+            continue
+        data = node.content.encode('utf-8')
+        if compressor:
+            (store / f"{node.id}.md.zst").write_bytes(compressor.compress(data))
+        else:
+            (store / f"{node.id}.md").write_bytes(data)
+    
+    stripped = tree.model_copy(update={
+        'nodes': {path: node.model_copy(update={'content': ''}) for path, node in tree.nodes.items()}
+    })
+    data = pickle.dumps(stripped, protocol=pickle.HIGHEST_PROTOCOL)
+    if compressor:
+        data = compressor.compress(data)
+    # Write-then-rename so an interrupted write never leaves a truncated tree behind
+    temp_path = cache_path.with_name(f".{cache_path.name}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, cache_path)
+    
+    # Only after the new tree is written, so the old one never loses content it references
+    node_ids = {node.id for node in tree.nodes.values()}
+    with os.scandir(store) as entries:
+        for entry in entries:
+            if entry.name.split('.', 1)[0] not in node_ids and entry.is_file():
+                os.unlink(entry.path)
+
+def read_tree_cache(cache_path: Path, load_content: bool = True) -> DocumentTree:
+    """
+    Load a document tree written by write_tree_cache (plain pickles are still
+    accepted). With load_content=False only metadata is loaded; fill content
+    later with load_tree_content.
+    """
+    data = cache_path.read_bytes()
+    if data.startswith(_ZSTD_MAGIC):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"{cache_path} is zstd-compressed but the zstandard package is not installed")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    tree = pickle.loads(data)
+    if load_content:
+        load_tree_content(tree, cache_path)
+    return tree
+
+def load_tree_content(tree: DocumentTree, cache_path: Path, paths: Optional[Iterable[str]] = None):
+    """Fill in content for all nodes (or just `paths`) that do not have it yet from the content store"""
+    store = _content_store_path(cache_path)
+    if not store.is_dir():
+        return
+    
+    decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+    for path in (tree.nodes if paths is None else paths):
+        node = tree.nodes.get(path)
+        if node is None or node.content:
+            continue
+        compressed = store / f"{node.id}.md.zst"
+        plain = store / f"{node.id}.md"
+        if decompressor and compressed.exists():
+            node.content = decompressor.decompress(compressed.read_bytes()).decode('utf-8')
+        elif plain.exists():
+            node.content = plain.read_bytes().decode('utf-8')
+
+def _manifest_path(cache_path: Path) -> Path:
+    """Per-document content hash manifest stored next to a tree cache file"""
+    return cache_path.with_suffix('.manifest.json')
+
+def read_tree_manifest(cache_path: Path) -> Optional[Dict[str, str]]:
+    """Relative path -> content hash recorded when the tree cache was written, or None if absent"""
+    try:
+        return loads_json(_manifest_path(cache_path).read_bytes())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def write_tree_manifest(cache_path: Path, manifest: Dict[str, str]):
+    """Atomically replace the content hash manifest for a tree cache"""
+    path = _manifest_path(cache_path)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_text(dumps_json(manifest), encoding='utf-8')
+    os.replace(temp_path, path)
+
+# =============================================================================
+# LLM Response Cache
+# =============================================================================
+
+class ResponseCache:
+    """
+    Disk cache for generator outputs. Entries are keyed on the generator name,
+    the configured LM and the canonical JSON of the whitespace-normalized
+    inputs (code blocks kept verbatim), so re-runs over unchanged (or only
+    reformatted) modules skip the LLM call entirely.
+    """
+    
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+    
+    def key(self, name: str, inputs: Dict[str, Any]) -> str:
+        """SHA-256 over generator name, model name and sorted normalized inputs"""
+        model = getattr(dspy.settings.lm, 'model', None)
+        normalized = {k: normalize_whitespace(v) if isinstance(v, str) else v for k, v in inputs.items()}
+        payload = json.dumps({'name': name, 'model': model, 'inputs': normalized}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def call(self, name: str, generator, output_fields: Tuple[str, ...], **inputs) -> Dict[str, str]:
+        """Return the cached output fields for these inputs, calling the generator on a miss"""
+        path = self.cache_dir / f"{self.key(name, inputs)}.json"
+        try:
+            data = path.read_bytes()
+            if ZSTD_AVAILABLE and data.startswith(_ZSTD_MAGIC):
+                data = zstandard.ZstdDecompressor().decompress(data)
+            outputs = json.loads(data)
+            if not isinstance(outputs, dict) or not all(field in outputs for field in output_fields):
+                raise ValueError(f"Incomplete response cache entry {path.name}")
+            # Hits refresh the mtime so pruning evicts least recently used entries
+            os.utime(path)
+            self.hits += 1
+            return outputs
+        except (FileNotFoundError, ValueError, *_ZSTD_ERRORS):
+            # Missing, corrupt or incomplete, or compressed while zstandard is unavailable: regenerate
+            self.misses += 1
+        
+        result = generator(**inputs)
+        outputs = {field: getattr(result, field) for field in output_fields}
+        
+        data = json.dumps(outputs).encode('utf-8')
+        if ZSTD_AVAILABLE:
+            data = zstandard.ZstdCompressor(level=3).compress(data)
+        # Write-then-rename so concurrent module workers never read a partial entry
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+        return outputs
+
+# Persisted LLM outputs beyond these limits are pruned, least recently used first
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+CACHE_MAX_AGE_DAYS = 30
+
+def prune_cache_dir(cache_dir: Union[str, Path], max_bytes: int = CACHE_MAX_BYTES,
+                    max_age_days: float = CACHE_MAX_AGE_DAYS) -> Tuple[int, int]:
+    """
+    Delete files under cache_dir not used within max_age_days, then the least
+    recently used ones until the total size fits in max_bytes. Returns
+    (files removed, bytes freed).
+    """
+    entries = []
+    stack = [os.fspath(cache_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+        except FileNotFoundError:
+            continue
+    
+    cutoff = time.time() - max_age_days * 86400
+    total = sum(size for _, size, _ in entries)
+    removed = freed = 0
+    for mtime, size, path in sorted(entries):
+        if mtime >= cutoff and total - freed <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        removed += 1
+        freed += size
+    return removed, freed
+
+class SingleFlightMemo:
+    """
+    In-process memo of LLM outputs keyed on their exact inputs. Concurrent
+    callers with the same key wait on the first caller's request instead of
+    issuing a duplicate; failures are not memoized. At most max_entries
+    results are kept, least recently used evicted first.
+    """
+    
+    def __init__(self, max_entries: int = 4096):
+        self._lock = threading.Lock()
+        self._futures: OrderedDict[str, Future] = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str, fn):
+        """Return the memoized result for key, calling fn once on a miss"""
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+                self.misses += 1
+                # Waiters hold their own reference, so evicting an in-flight entry is safe
+                while len(self._futures) > self.max_entries:
+                    self._futures.popitem(last=False)
+            else:
+                self._futures.move_to_end(key)
+                self.hits += 1
+        if not owner:
+            return future.result()
+        
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+# Boilerplate pages and copied READMEs share one classification per run
+_CLASSIFICATION_MEMO = SingleFlightMemo()
+
+def classification_memo() -> SingleFlightMemo:
+    """The process-wide document classification memo (for hit-rate reporting)"""
+    return _CLASSIFICATION_MEMO
+
 # =============================================================================
 # Repository Manager
 # =============================================================================
@@ -152,7 +597,7 @@ class RepoManager:
         
     def _get_repo_cache_path(self, repo_url: str) -> Path:
         """Generate cache path for repository"""
-        repo_hash = hashlib.md5(repo_url.encode()).hexdigest()
+        repo_hash = hash_key(repo_url)
         repo_name = urlparse(repo_url).path.strip('/').replace('/', '_')
         return self.cache_dir / f"{repo_name}_{repo_hash}"
     
@@ -161,15 +606,24 @@ class RepoManager:
         cache_path = self._get_repo_cache_path(repo_url)
         return cache_path / "document_tree.pkl"
     
-    def clone_or_update_repo(self, repo_url: str, force_update: bool = False) -> Path:
-        """Clone repository or update if it exists"""
+    def clone_or_update_repo(self, repo_url: str, force_update: bool = False,
+                             include_folders: Optional[List[str]] = None) -> Path:
+        """
+        Clone repository or update if it exists.
+        
+        When include_folders is given, the working tree is limited to those
+        folders (plus root files) with a cone-mode sparse checkout.
+        """
         repo_path = self._get_repo_cache_path(repo_url)
         
         if repo_path.exists() and not force_update:
             logger.info(f"Repository already cached at {repo_path}")
             try:
                 repo = git.Repo(repo_path)
-                repo.remotes.origin.pull()
+                self._apply_sparse_checkout(repo, include_folders)
+                # Shallow fetch + hard reset instead of pull (no merge, no history)
+                repo.git.fetch('--depth=1', '--no-tags')
+                repo.git.reset('--hard', 'origin/HEAD')
                 logger.info("Updated repository with latest changes")
             except Exception as e:
                 logger.warning(f"Warning: Could not update repository: {e}")
@@ -180,59 +634,86 @@ class RepoManager:
             shutil.rmtree(repo_path)
             
         logger.info(f"Cloning repository to {repo_path}")
-        git.Repo.clone_from(repo_url, repo_path)
+        # Only the current tree is read, so skip history and tags and fetch blobs lazily;
+        # with a sparse checkout only the blobs under include_folders are downloaded
+        multi_options = ['--depth=1', '--single-branch', '--filter=blob:none', '--no-tags']
+        if include_folders:
+            multi_options.append('--no-checkout')
+        repo = git.Repo.clone_from(repo_url, repo_path, multi_options=multi_options)
+        
+        if include_folders:
+            self._apply_sparse_checkout(repo, include_folders)
+            repo.git.checkout(repo.head.reference.name)
         return repo_path
     
+    @staticmethod
+    def _apply_sparse_checkout(repo, include_folders: Optional[List[str]]):
+        """Restrict the working tree to include_folders, or restore a full checkout when none are given"""
+        try:
+            if include_folders:
+                # Root files are always part of a cone checkout, so '.' needs no pattern
+                folders = [f.replace('\\', '/').strip('/') for f in include_folders]
+                repo.git.sparse_checkout('set', '--cone', *(f for f in folders if f and f != '.'))
+            elif repo.config_reader().get_value('core', 'sparseCheckout', False):
+                repo.git.sparse_checkout('disable')
+        except git.GitCommandError as e:
+            # Older git without sparse-checkout support: fall back to a full checkout
+            logger.warning(f"Sparse checkout unavailable, using full checkout: {e}")
+    
     def find_documentation_files(self, repo_path: Path, include_folders: Optional[List[str]] = None) -> List[Path]:
-        """Find all markdown files in repository, optionally filtered by folders"""
-        md_files = []
-        for ext in ['*.md', '*.mdx']:
-            md_files.extend(repo_path.rglob(ext))
-        
-        excluded_patterns = {
-            'node_modules', '.git', '__pycache__', '.pytest_cache',
-            'venv', 'env', '.venv', 'build', 'dist', 'tests'
-        }
-        
-        filtered_files = []
-        for file_path in md_files:
-            if not any(excluded in file_path.parts for excluded in excluded_patterns):
-                filtered_files.append(file_path)
-
-        # Remove common non-content files
-        filtered_files = [
-            file for file in filtered_files 
-            if not file.name.lower().startswith(('license', 'contributing', 'code_of_conduct', 'security', 'patents'))
-        ]
+        """Find all markdown files in repository, optionally restricted to the given folders"""
+        # (directory, recursive) pairs to walk
+        search_roots = []
         
-        # Filter by include_folders if specified
         if include_folders:
-            folder_filtered_files = []
-            for file_path in filtered_files:
-                # Get relative path from repo root
-                rel_path = file_path.relative_to(repo_path)
-                rel_path_str = str(rel_path)
+            # Validate include folders up front and only walk the requested subtrees
+            for include_folder in include_folders:
+                # Normalize folder path (remove leading/trailing slashes, use forward slashes)
+                include_folder = include_folder.replace('\\', '/').strip('/')
                 
-                # Check if file is in any of the included folders
-                for include_folder in include_folders:
-                    # Normalize folder path (remove leading/trailing slashes)
-                    include_folder = include_folder.strip('/')
-                    
-                    # Check if file path starts with the include folder
-                    if rel_path_str.startswith(include_folder + '/') or rel_path_str.startswith(include_folder + '\\'):
-                        folder_filtered_files.append(file_path)
-                        break
-                    # Also check if the file is directly in the include folder (for root level includes)
-                    elif include_folder == '.' and '/' not in rel_path_str and '\\' not in rel_path_str:
-                        folder_filtered_files.append(file_path)
-                        break
-                    # Check if the include folder is the exact parent directory
-                    elif str(rel_path.parent) == include_folder or str(rel_path.parent).replace('\\', '/') == include_folder:
-                        folder_filtered_files.append(file_path)
-                        break
-            
-            filtered_files = folder_filtered_files
-            logger.info(f"Filtered to {len(filtered_files)} files from specified folders: {include_folders}")
+                # '.' selects files directly in the repository root
+                if include_folder == '.':
+                    search_roots.append((str(repo_path), False))
+                    continue
+                
+                # The exclusion list applies to the include path itself, not just below it
+                if any(part in _EXCLUDED_DIRS for part in include_folder.split('/')):
+                    logger.warning(f"Include folder is inside an excluded directory, skipping: {include_folder!r}")
+                    continue
+                
+                folder_path = repo_path / include_folder
+                if not include_folder or not folder_path.is_dir():
+                    logger.warning(f"Include folder not found, skipping: {include_folder!r}")
+                    continue
+                
+                search_roots.append((str(folder_path), True))
+        else:
+            search_roots.append((str(repo_path), True))
+        
+        # Iterative scandir walk: DirEntry type checks come from the directory read itself,
+        # excluded directories are pruned before descending, and Paths are only built for matches
+        md_files = set()
+        for root, recursive in search_roots:
+            stack = [root]
+            while stack:
+                dir_path = stack.pop()
+                try:
+                    with os.scandir(dir_path) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive and entry.name not in _EXCLUDED_DIRS:
+                                    stack.append(entry.path)
+                            elif entry.name.endswith(('.md', '.mdx')) and entry.is_file():
+                                # Skip common non-content files (license, contributing, ...)
+                                if not _EXCLUDED_NAME_RE.match(entry.name):
+                                    md_files.add(entry.path)
+                except OSError as e:
+                    logger.warning(f"Could not scan directory {dir_path}: {e}")
+        
+        filtered_files = [Path(file_path) for file_path in md_files]
+        
+        if include_folders:
+            logger.info(f"Found {len(filtered_files)} files in specified folders: {include_folders}")
         
         return sorted(filtered_files)
     
@@ -241,8 +722,7 @@ class RepoManager:
         cache_path = self._get_tree_cache_path(repo_url)
         cache_path.parent.mkdir(exist_ok=True)
         
-        with open(cache_path, 'wb') as f:
-            pickle.dump(tree, f)
+        write_tree_cache(tree, cache_path)
         logger.info(f"Saved document tree cache to {cache_path}")
     
     def load_tree_cache(self, repo_url: str) -> Optional[DocumentTree]:
@@ -253,8 +733,7 @@ class RepoManager:
             return None
             
         try:
-            with open(cache_path, 'rb') as f:
-                tree = pickle.load(f)
+            tree = read_tree_cache(cache_path)
             logger.info(f"Loaded document tree cache from {cache_path}")
             return tree
         except Exception as e:
@@ -268,20 +747,26 @@ class RepoManager:
 class ContentExtractor:
     """Extract structured content from markdown files"""
     
+    # Headings and fenced code blocks in a single pass; only the code body is DOTALL,
+    # and headings inside a fenced block are consumed by the block match
+    _MARKDOWN_RE = re.compile(
+        r'(?P<heading>^(#{1,6})\s+(.+)$)|(?P<code>```(\w+)?\n((?s:.*?))\n```)',
+        re.MULTILINE
+    )
+    
     @staticmethod
     def extract_basic_metadata(content: str, filepath: Path) -> Dict[str, Any]:
         """Extract basic metadata from markdown content"""
-        try:
-            post = frontmatter.loads(content)
-            frontmatter_data = post.metadata
-            clean_content = post.content
-        except:
-            frontmatter_data = {}
-            clean_content = content
+        frontmatter_data = {}
+        clean_content = content
+        
+        match = _FRONTMATTER_RE.match(content)
+        if match:
+            frontmatter_data = ContentExtractor._parse_frontmatter(match.group(1))
+            clean_content = match.group(2)
         
-        title = ContentExtractor._extract_title(clean_content, frontmatter_data, filepath.name)
-        headings = ContentExtractor._extract_headings(clean_content)
-        code_blocks = ContentExtractor._extract_code_blocks(clean_content)
+        h1, headings, code_blocks = ContentExtractor._scan_markdown(clean_content)
+        title = ContentExtractor._extract_title(h1, frontmatter_data, filepath.name)
         
         # Compute additional features
         primary_language = ContentExtractor._get_primary_language(code_blocks)
@@ -295,40 +780,46 @@ class ContentExtractor:
         }
     
     @staticmethod
-    def _extract_title(content: str, frontmatter_data: dict, filename: str) -> str:
-        """Extract document title"""
-        if 'title' in frontmatter_data:
-            return frontmatter_data['title'].strip()
+    def _parse_frontmatter(raw: str) -> Dict[str, Any]:
+        """Parse a YAML frontmatter block, returning {} if it is not a mapping"""
+        try:
+            data = yaml.load(raw, Loader=_YAML_LOADER) or {}
+        except yaml.YAMLError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    
+    @staticmethod
+    def _extract_title(h1: Optional[str], frontmatter_data: dict, filename: str) -> str:
+        """Extract document title from frontmatter, the first H1, or the filename"""
+        title = frontmatter_data.get('title')
+        # YAML may give a number, list or mapping here; only scalars are usable titles
+        if isinstance(title, (str, int, float)) and str(title).strip():
+            return str(title).strip()
         
-        h1_match = re.search(r'^# (.+)$', content, re.MULTILINE)
-        if h1_match:
-            return h1_match.group(1).strip()
+        if h1 is not None:
+            return h1.strip()
         
         return filename.replace('.md', '').replace('.mdx', '').replace('_', ' ').replace('-', ' ').title().strip()
     
     @staticmethod
-    def _extract_headings(content: str) -> List[str]:
-        """Extract all headings from content, retaining Markdown # characters."""
+    def _scan_markdown(content: str) -> Tuple[Optional[str], List[str], List[Dict[str, str]]]:
+        """Collect the first H1, all headings (with # characters) and code blocks in one pass"""
+        h1 = None
         headings = []
-        for match in re.finditer(r'^(#{1,6})\s+(.+)$', content, re.MULTILINE):
-            hashes = match.group(1)
-            text = match.group(2).strip()
-            headings.append(f"{hashes} {text}")
-        return headings
-    
-    @staticmethod
-    def _extract_code_blocks(content: str) -> List[Dict[str, str]]:
-        """Extract code blocks with language information"""
         code_blocks = []
-        pattern = r'```(\w+)?\n(.*?)\n```'
-        for match in re.finditer(pattern, content, re.DOTALL):
-            language = match.group(1) or 'text'
-            code_content = match.group(2).strip()
-            code_blocks.append({
-                'language': language,
-                'content': code_content
-            })
-        return code_blocks
+        for match in ContentExtractor._MARKDOWN_RE.finditer(content):
+            if match.group('heading'):
+                hashes = match.group(2)
+                text = match.group(3).strip()
+                headings.append(f"{hashes} {text}")
+                if h1 is None and match.group('heading').startswith('# '):
+                    h1 = match.group('heading')[2:]
+            else:
+                code_blocks.append({
+                    'language': match.group(5) or 'text',
+                    'content': match.group(6).strip()
+                })
+        return h1, headings, code_blocks
     
     @staticmethod
     def _get_primary_language(code_blocks: List[Dict[str, str]]) -> Optional[str]:
@@ -357,7 +848,7 @@ class DocumentParserModule(dspy.Module):
     
     def __init__(self):
         super().__init__()
-        self.classifier = dspy.ChainOfThought(DocumentClassifier)
+        self.classifier = _CLASSIFIER
     
     def forward(self, content: str, filename: str, filepath: Path, overview_context: str = "") -> DocumentMetadata:
         """Parse document and extract comprehensive metadata"""
@@ -369,32 +860,22 @@ class DocumentParserModule(dspy.Module):
         DOCUMENT_PARSER_MAX_CHARS = 3000
         
         try:
-            # Get LLM-enhanced analysis using single classifier
-            classification = self.classifier(
-                content=content[:DOCUMENT_PARSER_MAX_CHARS],
-                overview_context=overview_context
+            # Get LLM-enhanced analysis using single classifier; documents whose
+            # classifier input differs only in whitespace reuse one call
+            classifier_content = content[:DOCUMENT_PARSER_MAX_CHARS]
+            # The configured model is part of the key so switching LMs never reuses another model's output
+            model = getattr(dspy.settings.lm, 'model', None)
+            classification = _CLASSIFICATION_MEMO.get(
+                f"{model}:{hash_key(overview_context)}:{hash_key(normalize_whitespace(classifier_content))}",
+                lambda: self.classifier(content=classifier_content, overview_context=overview_context)
             )
             
             # Parse LLM outputs with safe extraction
             semantic_summary = getattr(classification, 'semantic_summary', f"Documentation for {basic_data['title']}")
             
-            # Safely handle key_concepts (could be string or list)
-            key_concepts_raw = getattr(classification, 'key_concepts', "")
-            if isinstance(key_concepts_raw, list):
-                key_concepts = key_concepts_raw
-            elif isinstance(key_concepts_raw, str):
-                key_concepts = [concept.strip() for concept in key_concepts_raw.split(",") if concept.strip()] if key_concepts_raw else []
-            else:
-                key_concepts = []
-            
-            # Safely handle learning_objectives (could be string or list)
-            learning_objectives_raw = getattr(classification, 'learning_objectives', "")
-            if isinstance(learning_objectives_raw, list):
-                learning_objectives = learning_objectives_raw
-            elif isinstance(learning_objectives_raw, str):
-                learning_objectives = [obj.strip() for obj in learning_objectives_raw.split(",") if obj.strip()] if learning_objectives_raw else []
-            else:
-                learning_objectives = []
+            # Bullet-list outputs are split client-side
+            key_concepts = self._parse_list_output(getattr(classification, 'key_concepts', ""))
+            learning_objectives = self._parse_list_output(getattr(classification, 'learning_objectives', ""))
             
             doc_type = self._safe_enum_parse(classification.doc_type, DocumentType, DocumentType.GUIDE)
             
@@ -422,6 +903,18 @@ class DocumentParserModule(dspy.Module):
             semantic_summary=semantic_summary
         )
     
+    @staticmethod
+    def _parse_list_output(raw: Any) -> List[str]:
+        """Split a '- ' bullet list (or comma-separated string, or list) into items"""
+        if isinstance(raw, list):
+            return raw
+        if not isinstance(raw, str) or not raw:
+            return []
+        bullets = [line.strip()[2:].strip() for line in raw.splitlines() if line.strip().startswith('- ')]
+        if bullets:
+            return [item for item in bullets if item]
+        return [item.strip() for item in raw.split(",") if item.strip()]
+    
     def _safe_enum_parse(self, value: str, enum_class, default):
         """Safely parse enum value with fallback"""
         try:
@@ -437,13 +930,18 @@ class DocumentParserModule(dspy.Module):
 class LearningPathGenerator(dspy.Module):
     """DSPy module to generate comprehensive learning paths with Introduction → Topic modules → Conclusion"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
         super().__init__()
-        self.clusterer = dspy.ChainOfThought(DocumentClusterer)
-        self.welcome_generator = dspy.ChainOfThought(WelcomeMessageGenerator)
+        self.clusterer = _CLUSTERER
+        self.welcome_generator = _WELCOME_GENERATOR
+        # Generated paths are persisted per (repo, complexity, inputs hash) when set
+        self.cache_dir = Path(cache_dir) if cache_dir else None
     
     def forward(self, documents: List[DocumentNode], complexity: ComplexityLevel, 
-                repo_name: str, overview_context: str = "") -> GroupedLearningPath:
+                repo_name: str, overview_context: str = "",
+                documents_info_json: Optional[str] = None,
+                doc_path_map: Optional[Dict[str, DocumentNode]] = None,
+                duplicate_paths: Optional[Dict[str, List[str]]] = None) -> GroupedLearningPath:
         """
         Generate a comprehensive learning path for the given complexity level
         
@@ -452,6 +950,9 @@ class LearningPathGenerator(dspy.Module):
             complexity: Target complexity level
             repo_name: Name of the repository/project
             overview_context: Overview document content for context
+            documents_info_json: Pre-serialized documents info; built from documents if omitted
+            doc_path_map: Path to document mapping used to validate linked docs; built if omitted
+            duplicate_paths: Representative path to the paths of documents deduplicated into it
             
         Returns:
             GroupedLearningPath: Complete learning path with modules and welcome message
@@ -460,18 +961,23 @@ class LearningPathGenerator(dspy.Module):
         logger.info(f"Generating learning path for {complexity.value} level with {len(documents)} documents")
         
         # Prepare comprehensive document information for the LLM
-        documents_info = self._prepare_documents_info(documents)
+        if documents_info_json is None:
+            documents_info_json = dumps_json(self._prepare_documents_info(documents))
         
         # Use LLM to intelligently cluster documents into modules
+        modules: List[LearningModule] = []
         try:
-            cluster_result = self.clusterer(
-                documents_info=json.dumps(documents_info),
-                target_complexity=complexity.value,
-                overview_context=overview_context
+            cluster_result = call_with_retry(
+                lambda: self.clusterer(
+                    documents_info=documents_info_json,
+                    target_complexity=complexity.value,
+                    overview_context=overview_context
+                ),
+                f"Clustering for {complexity.value} level"
             )
             
             # Parse the modules from LLM output
-            modules = self._parse_modules_from_llm(cluster_result.modules, documents)
+            modules = self._parse_modules_from_llm(cluster_result.modules, documents, doc_path_map)
             
         except Exception as e:
             logger.error(f"Error in LLM clustering: {e}")
@@ -480,6 +986,15 @@ class LearningPathGenerator(dspy.Module):
             logger.warning(f"No modules generated for {complexity.value} level")
             return None
         
+        # Modules link every copy of a deduplicated document, right after its representative
+        if duplicate_paths:
+            for module in modules:
+                module.documents = list(dict.fromkeys(
+                    path
+                    for doc_path in module.documents
+                    for path in (doc_path, *duplicate_paths.get(doc_path, ()))
+                ))
+        
         # Generate comprehensive course information
         course_info = self._generate_course_info(modules, complexity, repo_name, overview_context)
         
@@ -500,8 +1015,9 @@ class LearningPathGenerator(dspy.Module):
         """Generate learning paths for all complexity levels"""
         grouped_paths = []
         
-        # Get all documents (no complexity filtering - let LLM decide)
-        all_documents = list(tree.nodes.values())
+        # Get all documents (no complexity filtering - let LLM decide), in path order so the
+        # prompt and cache key do not depend on directory listing order across clones
+        all_documents = sorted(tree.nodes.values(), key=lambda doc: doc.path)
         
         if not all_documents:
             logger.warning("No documents found for learning path generation")
@@ -509,57 +1025,140 @@ class LearningPathGenerator(dspy.Module):
             
         logger.info(f"Generating learning paths for {len(all_documents)} documents")
         
-        for complexity in ComplexityLevel:
+        # The document payload is identical for every complexity level, so build and serialize it once
+        documents_info, duplicate_paths = self._dedupe_documents_info(self._prepare_documents_info(all_documents))
+        documents_info_json = dumps_json(documents_info)
+        repo_name = tree.repo_name or "Documentation"
+        
+        # Cached paths are only reused for identical documents (and duplicates), overview and model
+        model = getattr(dspy.settings.lm, 'model', None)
+        inputs_key = hashlib.sha256(
+            dumps_json([documents_info_json, duplicate_paths, overview_context, model]).encode('utf-8')
+        ).hexdigest()
+        
+        def generate_level(complexity: ComplexityLevel) -> Optional[GroupedLearningPath]:
+            cache_path = self._get_path_cache_file(repo_name, complexity, inputs_key)
+            if cache_path is not None and cache_path.exists():
+                try:
+                    grouped_path = GroupedLearningPath.model_validate_json(cache_path.read_bytes())
+                    os.utime(cache_path)
+                    logger.info(f"Using cached learning path for {complexity.value} level")
+                    return grouped_path
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable learning path cache {cache_path}: {e}")
+            
             try:
                 # Generate learning path for this complexity level
                 grouped_path = self.forward(
                     documents=all_documents,
                     complexity=complexity,
-                    repo_name=tree.repo_name or "Documentation",
-                    overview_context=overview_context
+                    repo_name=repo_name,
+                    overview_context=overview_context,
+                    documents_info_json=documents_info_json,
+                    doc_path_map=tree.nodes,
+                    duplicate_paths=duplicate_paths
                 )
-                
-                if grouped_path:
-                    grouped_paths.append(grouped_path)
-                    
             except Exception as e:
                 logger.error(f"Error generating learning path for {complexity.value}: {e}")
-                continue
+                return None
+            
+            if grouped_path and cache_path is not None:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = cache_path.with_name(f".{cache_path.name}.tmp")
+                temp_path.write_text(grouped_path.model_dump_json(), encoding='utf-8')
+                os.replace(temp_path, cache_path)
+            return grouped_path
+        
+        # Complexity levels are independent LLM pipelines, so they run concurrently (results keep level order)
+        with ThreadPoolExecutor(max_workers=len(ComplexityLevel)) as executor:
+            grouped_paths = [path for path in executor.map(generate_level, ComplexityLevel) if path]
         
         return grouped_paths
     
+    def _get_path_cache_file(self, repo_name: str, complexity: ComplexityLevel, inputs_key: str) -> Optional[Path]:
+        """Cache file for one generated learning path, or None when caching is disabled"""
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / repo_name / f"{complexity.value}_{inputs_key[:16]}.json"
+    
     def _prepare_documents_info(self, documents: List[DocumentNode], n: int = 1000) -> Dict[str, Any]:
         """Prepare comprehensive document information for the LLM"""
 
         # add a function to get the first 1000 words of the document content
+        # (slices up to the nth word instead of splitting the whole document)
         def get_first_n_words(content: str, n: int) -> str:
-            return ' '.join(content.split()[:n])
+            end = 0
+            for i, match in enumerate(_WORD_RE.finditer(content), 1):
+                if i > n:
+                    break
+                end = match.end()
+            return content[:end]
         
         docs_info = {}
-        
-        for doc in documents:
-            # Create rich document information
-            doc_info = {
-                'title': doc.metadata.title,
-                'filename': doc.filename,
-                'semantic_summary': doc.metadata.semantic_summary or "No summary available",
-                'key_concepts': doc.metadata.key_concepts or [],
-                'learning_objectives': doc.metadata.learning_objectives or [],
-                'primary_language': doc.metadata.primary_language,
-                'headings': doc.metadata.headings[:5] if doc.metadata.headings else [],  # First 5 headings
+        columns = DocumentTree.node_columns(documents)
+        
+        for doc, path, title, filename, summary, key_concepts, objectives, language, headings in zip(
+            documents, columns['paths'], columns['titles'], columns['filenames'],
+            columns['semantic_summaries'], columns['key_concepts_lists'],
+            columns['learning_objectives_lists'], columns['primary_languages'], columns['headings_lists']
+        ):
+            # Create rich document information, with each field capped
+            docs_info[path] = {
+                'title': title,
+                'filename': filename,
+                'semantic_summary': (summary or "No summary available")[:DOCUMENT_SUMMARY_MAX_CHARS],
+                'key_concepts': (key_concepts or [])[:DOCUMENT_LIST_MAX_ITEMS],
+                'learning_objectives': (objectives or [])[:DOCUMENT_LIST_MAX_ITEMS],
+                'primary_language': language,
+                'headings': headings[:5] if headings else [],  # First 5 headings
                 'document_content': get_first_n_words(doc.content, n)
             }
-            
-            docs_info[doc.path] = doc_info
         
-        logger.info(f"Prepared information for {len(docs_info)} documents")
+        # Large repos can overflow the clusterer's context: halve content previews and
+        # list fields until the serialized payload fits the budget
+        size = len(dumps_json(docs_info))
+        while size > DOCUMENTS_INFO_MAX_BYTES and n > 1:
+            n //= 2
+            for doc, info in zip(documents, docs_info.values()):
+                info['document_content'] = get_first_n_words(doc.content, n)
+                for field in ('key_concepts', 'learning_objectives', 'headings'):
+                    info[field] = info[field][:max(1, len(info[field]) // 2)]
+            size = len(dumps_json(docs_info))
+        
+        logger.info(f"Prepared information for {len(docs_info)} documents ({size} bytes, {n}-word previews)")
         return docs_info
     
-    def _parse_modules_from_llm(self, modules_json: str, documents: List[DocumentNode]) -> List[LearningModule]:
+    @staticmethod
+    def _dedupe_documents_info(docs_info: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+        """
+        Collapse documents whose info (everything but the filename) is identical,
+        e.g. mirrored READMEs. Returns the info for one representative per group
+        and a map from each representative path to its duplicates' paths.
+        """
+        representatives = {}
+        representative_by_key = {}
+        duplicate_paths: Dict[str, List[str]] = {}
+        
+        for path, info in docs_info.items():
+            key = hash_key(dumps_json({field: value for field, value in info.items() if field != 'filename'}))
+            representative = representative_by_key.get(key)
+            if representative is None:
+                representative_by_key[key] = path
+                representatives[path] = info
+            else:
+                duplicate_paths.setdefault(representative, []).append(path)
+        
+        if duplicate_paths:
+            duplicate_count = sum(len(paths) for paths in duplicate_paths.values())
+            logger.info(f"Collapsed {duplicate_count} duplicate documents before clustering")
+        return representatives, duplicate_paths
+    
+    def _parse_modules_from_llm(self, modules_json: str, documents: List[DocumentNode],
+                                doc_path_map: Optional[Dict[str, DocumentNode]] = None) -> List[LearningModule]:
         """Parse modules from LLM JSON output and create LearningModule objects"""
         
         try:
-            modules_data = json.loads(modules_json)
+            modules_data = loads_json(modules_json)
             if not isinstance(modules_data, list):
                 logger.error("LLM output is not a list of modules")
                 return []
@@ -569,7 +1168,8 @@ class LearningPathGenerator(dspy.Module):
             return []
         
         modules = []
-        doc_path_map = {doc.path: doc for doc in documents}
+        if doc_path_map is None:
+            doc_path_map = {doc.path: doc for doc in documents}
         
         for i, module_data in enumerate(modules_data):
             try:
@@ -582,12 +1182,11 @@ class LearningPathGenerator(dspy.Module):
                 theme = module_data.get('theme', 'General')
                 
                 # Validate linked documents exist
-                valid_linked_docs = []
-                for doc_path in linked_docs:
-                    if doc_path in doc_path_map:
-                        valid_linked_docs.append(doc_path)
-                    else:
-                        logger.warning(f"Document not found: {doc_path}")
+                valid_linked_docs = [doc_path for doc_path in linked_docs if doc_path in doc_path_map]
+                if len(valid_linked_docs) != len(linked_docs):
+                    for doc_path in linked_docs:
+                        if doc_path not in doc_path_map:
+                            logger.warning(f"Document not found: {doc_path}")
                 
                 # Create assessment
                 assessment = AssessmentPoint(
@@ -621,15 +1220,13 @@ class LearningPathGenerator(dspy.Module):
         """Generate comprehensive course information including title, description, and welcome message"""
         
         # Create modules overview
-        modules_overview = []
-        for i, module in enumerate(modules):
-            modules_overview.append(f"Module {i+1}: {module.title}")
+        modules_overview = "\n".join(f"Module {i+1}: {module.title}" for i, module in enumerate(modules))
         
         try:
             course_info_result = self.welcome_generator(
                 repo_name=repo_name,
                 target_complexity=complexity.value,
-                modules_overview="\n".join(modules_overview),
+                modules_overview=modules_overview,
                 overview_context=overview_context
             )
             
@@ -651,16 +1248,28 @@ class LearningPathGenerator(dspy.Module):
 class CourseGenerator(dspy.Module):
     """Generate complete course content with all 5 module components"""
     
-    def __init__(self):
+    def __init__(self, response_cache_dir: Optional[Union[str, Path]] = None):
         super().__init__()
         # Use Predict instead of ChainOfThought for content generators to avoid reasoning field issues
-        self.intro_generator = dspy.ChainOfThought(ModuleIntroGenerator)
-        self.main_content_generator = dspy.ChainOfThought(ModuleMainContentGenerator)
-        self.conclusion_generator = dspy.ChainOfThought(ModuleConclusionGenerator)
-        self.summary_generator = dspy.ChainOfThought(ModuleSummaryGenerator)
-        self.assessment_content_generator = dspy.ChainOfThought(AssessmentContentGenerator)
-        self.course_conclusion_generator = dspy.ChainOfThought(CourseConclusionGenerator)
-        self.max_workers = 10
+        self.intro_generator = _INTRO_GENERATOR
+        self.main_content_generator = _MAIN_CONTENT_GENERATOR
+        self.conclusion_generator = _CONCLUSION_GENERATOR
+        self.summary_generator = _SUMMARY_GENERATOR
+        self.assessment_content_generator = _ASSESSMENT_CONTENT_GENERATOR
+        self.module_components_generator = _MODULE_COMPONENTS_GENERATOR
+        self.course_conclusion_generator = _COURSE_CONCLUSION_GENERATOR
+        # In-flight module generations; LLM calls are network-bound, so this tracks
+        # the provider's concurrency limit rather than the local CPU count
+        self.max_workers = LLM_MAX_CONCURRENCY
+        self.max_rate_limit_retries = 5
+        self.response_cache = ResponseCache(response_cache_dir) if response_cache_dir else None
+    
+    def _cached_call(self, name: str, generator, output_fields: Tuple[str, ...], **inputs) -> Dict[str, str]:
+        """Call a generator through the response cache when one is configured"""
+        if self.response_cache is None:
+            result = generator(**inputs)
+            return {field: getattr(result, field) for field in output_fields}
+        return self.response_cache.call(name, generator, output_fields, **inputs)
     
     def forward(self, pathway: GroupedLearningPath, tree: DocumentTree, overview_context: str = "") -> GeneratedCourse:
         """Generate complete course content with full context"""
@@ -671,12 +1280,18 @@ class CourseGenerator(dspy.Module):
         
         logger.info(f"Generating course content for {pathway.title}")
         
-        # Generate content for each module in parallel
-        logger.info(f"Generating {len(pathway.modules)} modules in parallel...")
-        parallel_module_contents = self._generate_modules_parallel(pathway, tree, overview_context)
-                
-        # Generate course conclusion
-        course_conclusion = self._generate_course_conclusion(pathway)
+        # Trim once; every generator call below reuses the identical prefix string
+        overview_context = overview_context[:OVERVIEW_CONTEXT_MAX_CHARS]
+        
+        # The course conclusion only needs module titles, so it runs alongside module generation
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            conclusion_future = executor.submit(self._generate_course_conclusion, pathway)
+            
+            # Generate content for each module in parallel
+            logger.info(f"Generating {len(pathway.modules)} modules in parallel...")
+            parallel_module_contents = self._generate_modules_parallel(pathway, tree, overview_context)
+            
+            course_conclusion = conclusion_future.result()
         
         # Create complete course
         course = GeneratedCourse(
@@ -692,23 +1307,31 @@ class CourseGenerator(dspy.Module):
         return course
     
     def _generate_modules_parallel(self, pathway: GroupedLearningPath, tree: DocumentTree, overview_context: str) -> List[ModuleContent]:
-        """Generate modules in parallel using threading (DSPy modules are not picklable for multiprocessing)"""
-        
-        from concurrent.futures import ThreadPoolExecutor
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Create a list of futures for each module
-            futures = []
-            for i, module in enumerate(pathway.modules):
-                future = executor.submit(self._generate_module_content, module, pathway, tree, overview_context, i)
-                futures.append(future)
-            
-            # Collect results
-            module_contents = []
-            for future in futures:
-                module_contents.append(future.result())
-
-        return module_contents    
+        """Generate modules concurrently on an event loop, bounded by max_workers in-flight modules"""
+        return asyncio.run(self._generate_modules_async(pathway, tree, overview_context))
+    
+    async def _generate_modules_async(self, pathway: GroupedLearningPath, tree: DocumentTree, overview_context: str) -> List[ModuleContent]:
+        """Gather module generation tasks under a shared semaphore (results keep module order)"""
+        
+        semaphore = asyncio.Semaphore(self.max_workers)
+        generate_module_content = dspy.asyncify(self._generate_module_content)
+        
+        async def generate_bounded(module: LearningModule, module_index: int) -> ModuleContent:
+            for attempt in range(self.max_rate_limit_retries + 1):
+                try:
+                    async with semaphore:
+                        return await generate_module_content(module, pathway, tree, overview_context, module_index)
+                except Exception as e:
+                    if attempt == self.max_rate_limit_retries or not _is_rate_limit_error(e):
+                        raise
+                    # Back off outside the semaphore so other modules keep the slot busy
+                    delay = 2 ** attempt
+                    logger.warning(f"Rate limited generating {module.title}, retrying in {delay}s")
+                    await asyncio.sleep(delay)
+        
+        return list(await asyncio.gather(
+            *(generate_bounded(module, i) for i, module in enumerate(pathway.modules))
+        ))
     
     def _generate_module_content(self, module: LearningModule, pathway: GroupedLearningPath,
                                tree: DocumentTree, overview_context: str, module_index: int) -> ModuleContent:
@@ -723,119 +1346,161 @@ class CourseGenerator(dspy.Module):
         # Generate all 5 components for the module
         course_context = f"This module, '{module.title}', is part of the '{pathway.title}' course. It covers: {module.description}"
         
-        intro = self._generate_module_introduction(module, overview_context, course_context)
-        main_content = self._generate_main_content(module, overview_context, source_documents)
-        conclusion = self._generate_module_conclusion(module, overview_context)
-        assessment = self._generate_assessment_content(module, overview_context, source_documents)
-        summary = self._generate_module_summary(module, overview_context)
+        # Join list fields once and share them across the generators
+        objectives_str = ", ".join(module.learning_objectives)
+        concepts_str = ", ".join(module.assessment.concepts_to_assess)
+        
+        # One LLM round-trip for all five components
+        try:
+            components = self._cached_call(
+                'module_components', self.module_components_generator, _MODULE_COMPONENT_FIELDS,
+                module_title=module.title,
+                module_description=module.description,
+                learning_objectives=objectives_str,
+                overview_context=overview_context,
+                course_context=course_context,
+                source_documents=source_documents,
+                assessment_title=module.assessment.title,
+                concepts_to_assess=concepts_str,
+                module_theme=module.theme
+            )
+        except Exception as e:
+            # Rate limits and provider errors propagate to the caller's retry; only unusable output falls back
+            if not _is_output_parse_error(e):
+                raise
+            logger.warning(f"Combined generation failed for module {module.title}, generating components separately: {e}")
+            components = {}
+        
+        # Components missing from the combined response fall back to their dedicated generator
+        fallbacks = {
+            'introduction': lambda: self._generate_module_introduction(module, objectives_str, overview_context, course_context),
+            'main_content': lambda: self._generate_main_content(module, objectives_str, overview_context, source_documents),
+            'conclusion': lambda: self._generate_module_conclusion(module, objectives_str, concepts_str, overview_context),
+            'assessment_content': lambda: self._generate_assessment_content(module, concepts_str, overview_context, source_documents),
+            'summary': lambda: self._generate_module_summary(module, objectives_str, concepts_str, overview_context),
+        }
+        # Run serially: this module holds one concurrency slot, so fanning out here would exceed max_workers
+        for field in fallbacks:
+            if not (components.get(field) or '').strip():
+                components[field] = fallbacks[field]()
         
         return ModuleContent(
             module_id=f"module_{module_index:02d}",
             title=module.title,
             description=module.description,
             learning_objectives=module.learning_objectives,
-            introduction=intro,
-            main_content=main_content,
-            conclusion=conclusion,
-            assessment=assessment,
-            summary=summary
+            introduction=components['introduction'],
+            main_content=components['main_content'],
+            conclusion=components['conclusion'],
+            assessment=components['assessment_content'],
+            summary=components['summary']
         )
     
-    def _get_source_documents_content(self, module: LearningModule, tree: DocumentTree) -> str:
-        """Get filtered and cleaned content from source documents for this module"""
+    def _get_source_documents_content(self, module: LearningModule, tree: DocumentTree,
+                                      max_tokens: int = SOURCE_DOCUMENTS_MAX_TOKENS) -> str:
+        """Get source documents for this module, trimmed at paragraph boundaries to max_tokens"""
         
-        source_content = []
+        # Documents are streamed into one buffer, newline-separated
+        buffer = io.StringIO()
+        total_tokens = 0
         
         logger.info(f"Getting source documents for module {module.title}: {module.documents}")
         
         for doc_path in module.documents:
-            if doc_path in tree.nodes:
-                node = tree.nodes[doc_path]
-                
-                if node.content.strip():
-                    doc_content = f"""
-## {node.metadata.title}
-{node.content}
-"""
-                    source_content.append(doc_content)
-                    logger.info(f"Added document: {node.filename} ({len(node.content)} chars)")
-                else:
-                    logger.info(f"Skipped document {node.filename} - no relevant content after cleaning")
-            else:
+            if total_tokens >= max_tokens:
+                logger.info(f"Source content budget of {max_tokens} tokens reached, skipping remaining documents")
+                break
+            
+            node = tree.nodes.get(doc_path)
+            if node is None:
                 logger.warning(f"Document not found in tree.nodes: {doc_path}")
+                continue
+            
+            if node.content.strip():
+                if buffer.tell():
+                    buffer.write("\n")
+                buffer.write("\n## ")
+                buffer.write(node.metadata.title)
+                buffer.write("\n")
+                buffer.write(node.content)
+                buffer.write("\n")
+                total_tokens += count_tokens(node.content)
+                logger.info(f"Added document: {node.filename} ({len(node.content)} chars)")
+            else:
+                logger.info(f"Skipped document {node.filename} - no relevant content after cleaning")
         
-        result = "\n".join(source_content)
+        result = trim_to_tokens(buffer.getvalue(), max_tokens)
         logger.info(f"Total cleaned source content length: {len(result)} chars")
         return result
     
-    def _generate_module_introduction(self, module: LearningModule, overview_context: str, course_context: str) -> str:
+    def _generate_module_introduction(self, module: LearningModule, objectives_str: str, overview_context: str, course_context: str) -> str:
         """Generate module introduction with full context"""
         
-        result = self.intro_generator(
+        return self._cached_call(
+            'module_intro', self.intro_generator, ('introduction',),
             module_title=module.title,
             module_description=module.description,
-            learning_objectives=", ".join(module.learning_objectives),
+            learning_objectives=objectives_str,
             overview_context=overview_context,
             course_context=course_context
-        )
-        return result.introduction
+        )['introduction']
     
-    def _generate_main_content(self, module: LearningModule, overview_context: str, source_documents: str) -> str:
+    def _generate_main_content(self, module: LearningModule, objectives_str: str, overview_context: str, source_documents: str) -> str:
         """Generate synthesized main content from source documents"""
         
-        result = self.main_content_generator(
+        return self._cached_call(
+            'module_main_content', self.main_content_generator, ('main_content',),
             module_title=module.title,
             module_description=module.description,
-            learning_objectives=", ".join(module.learning_objectives),
+            learning_objectives=objectives_str,
             overview_context=overview_context,
             source_documents=source_documents
-        )
-        return result.main_content
+        )['main_content']
     
-    def _generate_module_conclusion(self, module: LearningModule, overview_context: str) -> str:
+    def _generate_module_conclusion(self, module: LearningModule, objectives_str: str, concepts_str: str, overview_context: str) -> str:
         """Generate module conclusion"""
         
-        result = self.conclusion_generator(
+        return self._cached_call(
+            'module_conclusion', self.conclusion_generator, ('conclusion',),
             module_title=module.title,
-            learning_objectives=", ".join(module.learning_objectives),
-            key_concepts=", ".join(module.assessment.concepts_to_assess),
+            learning_objectives=objectives_str,
+            key_concepts=concepts_str,
             overview_context=overview_context
-        )
-        return result.conclusion
+        )['conclusion']
     
-    def _generate_assessment_content(self, module: LearningModule, overview_context: str, source_documents: str) -> str:
+    def _generate_assessment_content(self, module: LearningModule, concepts_str: str, overview_context: str, source_documents: str) -> str:
         """Generate assessment with questions and answers"""
         
-        result = self.assessment_content_generator(
+        return self._cached_call(
+            'module_assessment', self.assessment_content_generator, ('assessment_content',),
             assessment_title=module.assessment.title,
-            concepts_to_assess=", ".join(module.assessment.concepts_to_assess),
+            concepts_to_assess=concepts_str,
             module_theme=module.theme
-        )
-        return result.assessment_content
+        )['assessment_content']
     
-    def _generate_module_summary(self, module: LearningModule, overview_context: str) -> str:
+    def _generate_module_summary(self, module: LearningModule, objectives_str: str, concepts_str: str, overview_context: str) -> str:
         """Generate module summary"""
         
-        result = self.summary_generator(
+        return self._cached_call(
+            'module_summary', self.summary_generator, ('summary',),
             module_title=module.title,
-            learning_objectives=", ".join(module.learning_objectives),
-            key_concepts=", ".join(module.assessment.concepts_to_assess),
+            learning_objectives=objectives_str,
+            key_concepts=concepts_str,
             overview_context=overview_context
-        )
-        return result.summary
+        )['summary']
     
     def _generate_course_conclusion(self, pathway: GroupedLearningPath) -> str:
         """Generate course conclusion"""
         
-        modules_summary = []
-        for i, module in enumerate(pathway.modules):
-            modules_summary.append(f"Module {i+1}: {module.title} - {module.theme}")
+        modules_summary = "\n".join(
+            f"Module {i+1}: {module.title} - {module.theme}" for i, module in enumerate(pathway.modules)
+        )
         
-        result = self.course_conclusion_generator(
+        return self._cached_call(
+            'course_conclusion', self.course_conclusion_generator, ('conclusion',),
             course_title=pathway.title,
-            modules_completed="\n".join(modules_summary)
-        )
-        return result.conclusion
+            modules_completed=modules_summary
+        )['conclusion']
 
 
 # =============================================================================
@@ -862,40 +1527,22 @@ class CourseExporter:
                 complexity_level = "default"
 
             course_output_dir = output_path / complexity_level
+            module_dir_names = [f"module_{i:02d}" for i in range(1, len(course.modules) + 1)]
+            module_dirs = [course_output_dir / name for name in module_dir_names]
+            
+            # Create every target directory before any file is staged
             course_output_dir.mkdir(parents=True, exist_ok=True)
+            for module_dir in module_dirs:
+                module_dir.mkdir(exist_ok=True)
             
-            # Write main welcome and conclusion files
-            (course_output_dir / "00_welcome.md").write_text(course.welcome_message, encoding="utf-8")
-            (course_output_dir / "99_conclusion.md").write_text(course.course_conclusion, encoding="utf-8")
-                
-            # Create modules
             module_info_list = []
-            for i, module in enumerate(course.modules, 1):
-                module_dir_name = f"module_{i:02d}"
-                module_dir = course_output_dir / module_dir_name
-                module_dir.mkdir(exist_ok=True)
-                
-                file_info = {
-                    "intro": "01_intro.md",
-                    "main": "02_main.md",
-                    "conclusion": "03_conclusion.md",
-                    "assessment": "04_assessments.md",
-                    "summary": "05_summary.md",
-                }
-                
-                # Write module files
-                (module_dir / file_info['intro']).write_text(module.introduction, encoding='utf-8')
-                (module_dir / file_info['main']).write_text(module.main_content, encoding='utf-8')
-                (module_dir / file_info['conclusion']).write_text(module.conclusion, encoding='utf-8')
-                (module_dir / file_info['assessment']).write_text(module.assessment, encoding='utf-8')
-                (module_dir / file_info['summary']).write_text(module.summary, encoding='utf-8')
-
+            for module_dir_name, module in zip(module_dir_names, course.modules):
                 module_info_list.append({
                     "module_id": module_dir_name,
                     "title": module.title,
                     "description": module.description,
                     "learning_objectives": module.learning_objectives,
-                    "files": list(file_info.values())
+                    "files": list(_MODULE_FILES)
                 })
             
             # Create course_info.json
@@ -905,13 +1552,101 @@ class CourseExporter:
                 "modules": module_info_list
             }
             
-            with open(course_output_dir / "course_info.json", 'w', encoding='utf-8') as f:
-                json.dump(course_info, f, indent=2)
+            # Serialize straight to bytes, with orjson when it is installed
+            if ORJSON_AVAILABLE:
+                course_info_bytes = orjson.dumps(course_info, option=orjson.OPT_INDENT_2)
+            else:
+                course_info_bytes = json.dumps(course_info, indent=2).encode('utf-8')
+            
+            # Flat list of every file in the course, module components first
+            writes = [
+                (os.path.join(os.fspath(module_dir), filename), content)
+                for module_dir, module in zip(module_dirs, course.modules)
+                for filename, content in zip(_MODULE_FILES, (
+                    module.introduction, module.main_content, module.conclusion, module.assessment, module.summary
+                ))
+            ]
+            writes.extend([
+                (course_output_dir / "00_welcome.md", course.welcome_message),
+                (course_output_dir / "99_conclusion.md", course.course_conclusion),
+                (course_output_dir / "course_info.json", course_info_bytes),
+            ])
             
-            logger.info(f"Course exported to {course_output_dir}")
+            # Every file is staged first and only published once all of them were
+            # written, so a failed export never leaves half-written files behind
+            staged = []
+            published = 0
+            try:
+                # Small-file writes are syscall-bound, so files are staged concurrently
+                with ThreadPoolExecutor(max_workers=min(16, len(writes))) as executor:
+                    futures = [executor.submit(self._stage_file, path, content) for path, content in writes]
+                # Keep every successful file so it is discarded if another one failed
+                for future in futures:
+                    if future.exception() is None:
+                        staged.append(future.result())
+                for future in futures:
+                    future.result()
+                
+                total_bytes = sum(size for _, _, size in staged)
+                for item in staged:
+                    self._publish(item)
+                    published += 1
+            finally:
+                for item in staged[published:]:
+                    self._discard(item)
+            
+            logger.info(f"Course exported to {course_output_dir} ({len(staged)} files, {total_bytes} bytes)")
             print(f"Course exported to: {course_output_dir}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to export course: {e}", exc_info=True)
-            return False 
\ No newline at end of file
+            return False
+    
+    def _stage_file(self, path: Union[str, Path], content: Union[str, bytes]) -> Tuple[str, str, int]:
+        """
+        Write one (path, content) pair to a hidden temp file next to its target;
+        text is UTF-8 encoded. Returns (path, temp path, size). The target
+        directory must already exist.
+        """
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        path = os.fspath(path)
+        temp_path = self._temp_path(path)
+        try:
+            self._write_bytes(temp_path, data)
+        except Exception:
+            self._discard((path, temp_path, len(data)))
+            raise
+        return path, temp_path, len(data)
+    
+    @staticmethod
+    def _publish(staged: Tuple[str, str, int]):
+        """Move a staged file to its final path with an atomic rename."""
+        path, temp_path, _ = staged
+        os.replace(temp_path, path)
+    
+    @staticmethod
+    def _discard(staged: Tuple[str, str, int]):
+        """Remove a staged file that will not be published (missing files are ignored)."""
+        _, temp_path, _ = staged
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _temp_path(path: str) -> str:
+        """Hidden sibling name a file is written to before its final rename."""
+        directory, name = os.path.split(path)
+        return os.path.join(directory, f".{name}.tmp")
+    
+    @staticmethod
+    def _write_bytes(path: Union[str, Path], data: bytes):
+        """Write bytes with raw os-level calls, bypassing the buffered text I/O layer."""
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
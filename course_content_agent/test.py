@@ -3,16 +3,14 @@
 Test script for the Course Content Agent based on content-generation.ipynb
 """
 
+import os
 import sys
+import argparse
 from pathlib import Path
 
 # Add the parent directory to the path so we can import the course_content_agent
 sys.path.append(str(Path(__file__).parent.parent))
-from course_content_agent.main import CourseBuilder
 
-from datetime import datetime
-import hashlib
-import dspy
 import logging
 
 def setup_logging():
@@ -24,6 +22,8 @@ def setup_logging():
 
 def test_simple_course_builder():
     """Test using the simplified CourseBuilder interface"""
+    # Deferred so dspy and the signatures are only imported when a build runs
+    from course_content_agent.main import CourseBuilder
     
     print("\n" + "="*60)
     print("Testing simplified CourseBuilder interface")
@@ -52,6 +52,13 @@ def test_simple_course_builder():
     return success
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--no-cache", action="store_true", help="Disable LLM response caching and regenerate everything")
+    args = parser.parse_args()
+    if args.no_cache:
+        # Read when course_content_agent.main is imported, so set it first
+        os.environ["COURSE_AGENT_NO_CACHE"] = "1"
+    
     setup_logging()
     
     print("Course Content Agent Test Suite")
@@ -6,14 +6,39 @@ Scans and processes course content from structured directories.
 
 import json
 import logging
+import os
 import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from mcp_server.models import CourseState, ModuleState, StepState
 
+# Optional fast JSON parsing for course_info.json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Numeric ordering prefix on module and step names, e.g. "01-"
+_PREFIX_RE = re.compile(r"^\d+-")
+
+# Number of step files kept in memory by read_course_step
+STEP_CACHE_SIZE = 64
+
+
+def _loads_json_bytes(data: bytes):
+    """Parse JSON from raw bytes, using orjson when installed."""
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    # json.loads decodes UTF-8 bytes itself, skipping the text-file wrapper
+    return json.loads(data)
+
 
 class CourseContentProcessor:
     """Process course content from a local directory."""
@@ -21,6 +46,9 @@ class CourseContentProcessor:
     def __init__(self, course_directory: str = "course_output"):
         self.course_directory = Path(course_directory)
         self.courses: Dict[str, CourseState] = {}  # Caches scanned course structures
+        self._name_index: Dict[Path, Tuple[int, Dict[Tuple[bool, str], str]]] = {}  # Directory listings by mtime
+        # (level, module, step) -> (file path, mtime_ns, content), least recently used first
+        self._step_cache: "OrderedDict[Tuple[str, str, str], Tuple[Path, int, str]]" = OrderedDict()
 
     def scan_course_content(self, level: str) -> Optional[CourseState]:
         """
@@ -29,14 +57,15 @@ class CourseContentProcessor:
         """
         level_dir = self.course_directory / level
         course_info_path = level_dir / "course_info.json"
+        # A rescan means the content may have been regenerated
+        self._name_index.clear()
 
         if not course_info_path.is_file():
             logger.warning(f"Course info file not found: {course_info_path}")
             return None
 
         try:
-            with open(course_info_path, "r", encoding="utf-8") as f:
-                course_data = json.load(f)
+            course_data = _loads_json_bytes(course_info_path.read_bytes())
         except (json.JSONDecodeError, IOError) as e:
             logger.error(f"Error reading or parsing course info file {course_info_path}: {e}")
             return None
@@ -44,10 +73,10 @@ class CourseContentProcessor:
         modules = []
         total_steps = 0
         for module_data in course_data.get("modules", []):
-            module_name = re.sub(r"^\d+-", "", module_data["module_id"])
+            module_name = _PREFIX_RE.sub("", module_data["module_id"])
             steps = []
             for step_file in module_data.get("files", []):
-                step_name = re.sub(r"^\d+-", "", Path(step_file).stem)
+                step_name = _PREFIX_RE.sub("", Path(step_file).stem)
                 steps.append(StepState(name=step_name, status=0))
 
             if steps:
@@ -74,6 +103,35 @@ class CourseContentProcessor:
             modules=modules,
         )
 
+    def list_course_levels(self) -> List[str]:
+        """
+        Returns the sorted names of level directories that contain a course_info.json.
+        """
+        levels = []
+        try:
+            with os.scandir(self.course_directory) as entries:
+                for entry in entries:
+                    # DirEntry caches its type from the directory read, so no stat per entry
+                    if entry.name.startswith('.') or not entry.is_dir():
+                        continue
+                    if os.path.isfile(os.path.join(entry.path, "course_info.json")):
+                        levels.append(entry.name)
+        except OSError as e:
+            logger.error(f"Failed to list course directory {self.course_directory}: {e}")
+            return []
+        return sorted(levels)
+
+    def scan_all_levels(self, levels: List[str]) -> Dict[str, CourseState]:
+        """
+        Scans several course levels concurrently. Levels without valid content
+        are omitted; the result keeps the order of `levels`.
+        """
+        if not levels:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(levels)) as executor:
+            states = executor.map(self.scan_course_content, levels)
+            return {level: state for level, state in zip(levels, states) if state}
+
     def merge_course_states(self, current_state: CourseState, new_state: CourseState) -> CourseState:
         """
         Merges a user's saved progress with the latest course content.
@@ -81,8 +139,10 @@ class CourseContentProcessor:
         """
         existing_module_map = {module.name: module for module in current_state.modules}
         merged_modules = []
+        merged_names = set()
 
         for new_module in new_state.modules:
+            merged_names.add(new_module.name)
             existing_module = existing_module_map.get(new_module.name)
             if not existing_module:
                 merged_modules.append(new_module)
@@ -90,29 +150,25 @@ class CourseContentProcessor:
 
             existing_step_map = {step.name: step for step in existing_module.steps}
             merged_steps = []
+            # Recalculate module status in the same pass
+            all_done = True
+            any_started = False
             for new_step in new_module.steps:
-                existing_step = existing_step_map.get(new_step.name)
-                if existing_step:
-                    merged_steps.append(existing_step)  # Preserve status
-                else:
-                    merged_steps.append(new_step)
-
-            # Recalculate module status
-            if all(step.status == 2 for step in merged_steps):
-                module_status = 2
-            elif any(step.status > 0 for step in merged_steps):
-                module_status = 1
-            else:
-                module_status = 0
-
-            merged_module = new_module.copy(deep=True)
-            merged_module.status = module_status
-            merged_module.steps = merged_steps
+                step = existing_step_map.get(new_step.name, new_step)  # Preserve status
+                merged_steps.append(step)
+                if step.status != 2:
+                    all_done = False
+                if step.status > 0:
+                    any_started = True
+            module_status = 2 if all_done else (1 if any_started else 0)
+
+            # Steps are replaced wholesale, so a shallow copy is enough
+            merged_module = new_module.copy(update={"status": module_status, "steps": merged_steps})
             merged_modules.append(merged_module)
 
         # Ensure the current module still exists
         current_module_name = current_state.current_module
-        if not any(module.name == current_module_name for module in merged_modules):
+        if current_module_name not in merged_names:
             current_module_name = merged_modules[0].name if merged_modules else ""
 
         return CourseState(
@@ -127,7 +183,20 @@ class CourseContentProcessor:
     def read_course_step(self, level: str, module_name: str, step_name: str) -> Optional[str]:
         """
         Reads the content of a specific course step file.
+        Content is cached in memory and re-read only when the file's mtime changes.
         """
+        key = (level, module_name, step_name)
+        cached = self._step_cache.get(key)
+        if cached:
+            step_path, mtime, content = cached
+            try:
+                if os.stat(step_path).st_mtime_ns == mtime:
+                    self._step_cache.move_to_end(key)
+                    return content
+            except OSError:
+                pass  # Renamed or removed; resolve the step again below
+            del self._step_cache[key]
+
         level_dir = self.course_directory / level
         module_dir_name = self._find_item_by_name(level_dir, module_name, is_dir=True)
         if not module_dir_name:
@@ -140,25 +209,47 @@ class CourseContentProcessor:
             logger.error(f"Step '{step_name}' not found in '{module_name}'.")
             return None
 
+        step_path = module_path / step_file_name
         try:
-            with open(module_path / step_file_name, "r", encoding="utf-8") as f:
-                return f.read()
+            mtime = os.stat(step_path).st_mtime_ns
+            with open(step_path, "r", encoding="utf-8") as f:
+                content = f.read()
         except IOError as e:
             logger.error(f"Failed to read step '{step_file_name}': {e}")
             return None
 
+        self._step_cache[key] = (step_path, mtime, content)
+        if len(self._step_cache) > STEP_CACHE_SIZE:
+            self._step_cache.popitem(last=False)
+        return content
+
     def _find_item_by_name(self, base_path: Path, name: str, is_dir: bool = False, extension: str = "") -> Optional[str]:
         """Finds a directory or file that matches a name after stripping its prefix."""
-        if not base_path.exists():
+        index = self._get_name_index(base_path)
+        if index is None:
             return None
+        return index.get((is_dir, name))
 
-        for item in base_path.iterdir():
-            if is_dir and not item.is_dir():
-                continue
-            if not is_dir and item.is_dir():
-                continue
+    def _get_name_index(self, base_path: Path) -> Optional[Dict[Tuple[bool, str], str]]:
+        """
+        Maps (is_dir, prefix-stripped name) to the entry name for a directory,
+        listing it only when its mtime changes.
+        """
+        try:
+            mtime = base_path.stat().st_mtime_ns
+        except OSError:
+            return None
 
-            item_name_no_prefix = re.sub(r"^\d+-", "", item.stem if not is_dir else item.name)
-            if item_name_no_prefix == name:
-                return item.name
-        return None
\ No newline at end of file
+        cached = self._name_index.get(base_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        index = {}
+        with os.scandir(base_path) as entries:
+            for entry in entries:
+                is_dir = entry.is_dir()
+                stripped = _PREFIX_RE.sub("", entry.name if is_dir else os.path.splitext(entry.name)[0])
+                # First match wins, as with the original linear scan
+                index.setdefault((is_dir, stripped), entry.name)
+        self._name_index[base_path] = (mtime, index)
+        return index
\ No newline at end of file
@@ -88,20 +88,16 @@ async def handle_tool_call(
 async def _handle_list_courses(course_processor: CourseContentProcessor) -> List[TextContent]:
     """Handles the list_courses tool by scanning for and detailing available courses."""
     logger.info("Listing available courses.")
-    course_levels = []
-    for item in course_processor.course_directory.iterdir():
-        if item.is_dir() and not item.name.startswith('.'):
-            # Check if it's a valid course by looking for course_info.json
-            if (item / 'course_info.json').exists():
-                 course_levels.append(item.name)
+    course_levels = course_processor.list_course_levels()
 
     if not course_levels:
         logger.warning("No courses found during scan.")
         return [TextContent(type="text", text="No courses found.")]
 
     report = "# Available Courses\n\n"
-    for level in sorted(course_levels):
-        course_state = course_processor.scan_course_content(level)
+    course_states = course_processor.scan_all_levels(course_levels)
+    for level in course_levels:
+        course_state = course_states.get(level)
         if course_state:
             report += f"## {course_state.name} (`{level}`)\n"
             report += f"{course_state.description}\n\n"
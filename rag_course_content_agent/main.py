@@ -31,14 +31,26 @@ class RAGCourseContentAgent:
                           repo_url: str, 
                           include_folders: Optional[List[str]] = None,
                           force_update: bool = False,
-                          use_cache: bool = True) -> int:
-        """Process a repository and extract documentation"""
+                          use_cache: bool = True,
+                          check_remote: bool = True) -> int:
+        """
+        Process a repository and extract documentation.
+        
+        Analyses are cached per commit. With check_remote (the default) the remote
+        HEAD is resolved with `git ls-remote` before the cache lookup, so upstream
+        changes are picked up; pass check_remote=False to skip that network call
+        and reuse the cached clone's commit.
+        """
         
         logger.info(f"Processing repository: {repo_url}")
         
+        commit = None
+        if use_cache:
+            commit = self.repo_manager.get_cached_head(repo_url, check_remote=check_remote or force_update)
+        
         # Check for cached analysis first
         if use_cache:
-            cached_analysis = self.repo_manager.load_analysis_cache(repo_url)
+            cached_analysis = self.repo_manager.load_analysis_cache(repo_url, commit)
             if cached_analysis:
                 logger.info(f"Using cached analysis with {len(cached_analysis)} documents")
                 self.analyzed_docs = cached_analysis
@@ -56,7 +68,16 @@ class RAGCourseContentAgent:
                 return len(self.analyzed_docs)
         
         # Clone/update repository
-        repo_path = self.repo_manager.clone_or_update_repo(repo_url, force_update=force_update)
+        repo_path = self.repo_manager.clone_or_update_repo(
+            repo_url, force_update=force_update, include_folders=include_folders
+        )
+        local_head = self.repo_manager.get_local_head(repo_path)
+        if commit and local_head != commit and not force_update:
+            # The cached clone is behind the remote HEAD
+            repo_path = self.repo_manager.clone_or_update_repo(
+                repo_url, force_update=True, include_folders=include_folders
+            )
+            local_head = self.repo_manager.get_local_head(repo_path)
         
         # Find documentation files
         docs_files = self.repo_manager.find_documentation_files(
@@ -74,7 +95,7 @@ class RAGCourseContentAgent:
         logger.info(f"Analyzed {len(self.analyzed_docs)} documents")
         
         # Save analysis cache
-        self.repo_manager.save_analysis_cache(self.analyzed_docs, repo_url)
+        self.repo_manager.save_analysis_cache(self.analyzed_docs, repo_url, local_head)
         
         # Initialize vector database
         logger.info("Initializing vector database...")
@@ -1,9 +1,12 @@
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Tuple, Union
+import os
+import fnmatch
 import hashlib
 import logging
 import json
 import re
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 import git
 import pickle
@@ -27,6 +30,37 @@ from .modules import (
 
 logger = logging.getLogger(__name__)
 
+# Common documentation folders
+DOC_FOLDERS = (
+    "docs", "documentation", "doc", "guides", "tutorials",
+    "examples", "wiki", "help", "reference", "api", "manual"
+)
+
+# Common documentation file patterns
+DOC_PATTERNS = (
+    "*.md", "*.rst", "*.txt", "*.adoc", "*.asciidoc",
+    "README*", "CHANGELOG*", "CONTRIBUTING*", "GUIDE*",
+    "TUTORIAL*", "EXAMPLE*", "HOWTO*", "FAQ*"
+)
+
+# Vendored, VCS and build-tool directories never descended into during discovery
+_EXCLUDED_DIRS = frozenset({
+    'node_modules', '.git', '__pycache__', '.pytest_cache',
+    'venv', '.venv', 'site-packages', 'dist'
+})
+
+# All patterns as one compiled alternation, so each file name is matched once
+_DOC_FILE_RE = re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in DOC_PATTERNS))
+
+# Markdown metadata patterns, compiled once rather than looked up per document
+_TITLE_RE = re.compile(r'^# (.+)$', re.MULTILINE)
+_HEADING_RE = re.compile(r'^#{1,6} (.+)$', re.MULTILINE)
+_CODE_BLOCK_RE = re.compile(r'```(\w+)?\n(.*?)\n```', re.DOTALL)
+_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+
+# Seconds to wait for `git ls-remote` before falling back to the local clone
+REMOTE_HEAD_TIMEOUT = 10
+
 class RepoManager:
     """Manages repository operations (cloning, caching, file discovery)"""
     
@@ -39,30 +73,79 @@ class RepoManager:
         repo_name = urlparse(repo_url).path.strip('/').replace('/', '_')
         return self.cache_dir / repo_name
     
-    def _get_analysis_cache_path(self, repo_url: str) -> Path:
-        """Get the cache path for analysis results"""
+    def _get_analysis_cache_path(self, repo_url: str, commit: Optional[str] = None) -> Path:
+        """Get the cache path for analysis results (per commit when one is known)"""
         repo_name = urlparse(repo_url).path.strip('/').replace('/', '_')
+        if commit:
+            return self.cache_dir / f"{repo_name}_{commit[:12]}_analysis.pkl"
         return self.cache_dir / f"{repo_name}_analysis.pkl"
     
-    def clone_or_update_repo(self, repo_url: str, force_update: bool = False) -> Path:
-        """Clone or update a repository"""
+    def get_remote_head(self, repo_url: str) -> Optional[str]:
+        """Commit sha of the remote HEAD via `git ls-remote` (no clone), or None if unreachable"""
+        try:
+            output = git.cmd.Git().ls_remote(repo_url, 'HEAD', kill_after_timeout=REMOTE_HEAD_TIMEOUT)
+            return output.split()[0] if output else None
+        except Exception as e:
+            logger.warning(f"Could not resolve remote HEAD for {repo_url}: {e}")
+            return None
+    
+    @staticmethod
+    def get_local_head(repo_path: Path) -> Optional[str]:
+        """Commit sha checked out in a local clone, or None"""
+        try:
+            return git.Repo(repo_path).head.commit.hexsha
+        except Exception:
+            return None
+    
+    def get_cached_head(self, repo_url: str, check_remote: bool = True) -> Optional[str]:
+        """
+        Commit to key the analysis cache on: the remote HEAD, or else the HEAD of
+        the cached clone (offline, or check_remote=False to skip the network
+        round-trip and trust the clone as-is).
+        """
+        local_head = self.get_local_head(self._get_repo_cache_path(repo_url))
+        if local_head and not check_remote:
+            return local_head
+        return self.get_remote_head(repo_url) or local_head
+    
+    def clone_or_update_repo(self, repo_url: str, force_update: bool = False,
+                             include_folders: Optional[List[str]] = None) -> Path:
+        """
+        Clone or update a repository.
+        
+        Only the latest commit is fetched. When include_folders is given, the
+        working tree is limited with a cone-mode sparse checkout to those
+        folders plus root files; otherwise the full tree is checked out (and a
+        sparse checkout left by an earlier run is disabled).
+        """
         
         repo_path = self._get_repo_cache_path(repo_url)
         
         if repo_path.exists() and not force_update:
             logger.info(f"Using cached repository: {repo_path}")
+            try:
+                # The requested folders may differ from the ones checked out last time
+                self._apply_sparse_checkout(git.Repo(repo_path), include_folders)
+            except Exception as e:
+                logger.warning(f"Could not update sparse checkout for {repo_path}: {e}")
             return repo_path
         
         try:
             if repo_path.exists():
-                # Update existing repo
+                # Update existing repo (shallow fetch + hard reset instead of pull: no merge, no history)
                 logger.info(f"Updating repository: {repo_url}")
                 repo = git.Repo(repo_path)
-                repo.remotes.origin.pull()
+                self._apply_sparse_checkout(repo, include_folders)
+                repo.git.fetch('--depth=1', '--no-tags')
+                repo.git.reset('--hard', 'origin/HEAD')
             else:
-                # Clone new repo
+                # Clone new repo: no history or tags, blobs fetched lazily for the sparse tree only
                 logger.info(f"Cloning repository: {repo_url}")
-                git.Repo.clone_from(repo_url, repo_path)
+                repo = git.Repo.clone_from(repo_url, repo_path, multi_options=[
+                    '--depth=1', '--single-branch', '--filter=blob:none', '--no-tags', '--no-checkout'
+                ])
+                self._apply_sparse_checkout(repo, include_folders)
+                repo.git.checkout(repo.head.reference.name)
             
             return repo_path
             
@@ -70,45 +153,48 @@ class RepoManager:
             logger.error(f"Error with repository {repo_url}: {e}")
             raise
     
+    @staticmethod
+    def _apply_sparse_checkout(repo, include_folders: Optional[List[str]]):
+        """Restrict the working tree to include_folders, or restore a full checkout when none are given"""
+        try:
+            if include_folders:
+                # Root files are always part of a cone checkout, so '.' needs no pattern
+                folders = [f.replace('\\', '/').strip('/') for f in include_folders]
+                repo.git.sparse_checkout('set', '--cone', *(f for f in folders if f and f != '.'))
+            elif repo.config_reader().get_value('core', 'sparseCheckout', False):
+                repo.git.sparse_checkout('disable')
+        except git.GitCommandError as e:
+            # Older git without sparse-checkout support: fall back to a full checkout
+            logger.warning(f"Sparse checkout unavailable, using full checkout: {e}")
+    
     def find_documentation_files(self, repo_path: Path, include_folders: Optional[List[str]] = None) -> List[Path]:
         """Find documentation files in a repository"""
         
         doc_files = []
         
-        # Common documentation folders
-        doc_folders = include_folders or [
-            "docs", "documentation", "doc", "guides", "tutorials", 
-            "examples", "wiki", "help", "reference", "api", "manual"
-        ]
-        
-        # Common documentation file patterns
-        doc_patterns = [
-            "*.md", "*.rst", "*.txt", "*.adoc", "*.asciidoc",
-            "README*", "CHANGELOG*", "CONTRIBUTING*", "GUIDE*",
-            "TUTORIAL*", "EXAMPLE*", "HOWTO*", "FAQ*"
-        ]
+        doc_folders = include_folders or DOC_FOLDERS
+        matches = _DOC_FILE_RE.match
         
         try:
-            # Search in specific documentation folders
+            # Search in specific documentation folders (one walk per folder for all patterns)
             for folder in doc_folders:
                 folder_path = repo_path / folder
-                if folder_path.exists() and folder_path.is_dir():
-                    for pattern in doc_patterns:
-                        doc_files.extend(folder_path.rglob(pattern))
+                if folder_path.is_dir():
+                    doc_files.extend(self._scan_files(folder_path, matches, recursive=True))
             
             # Search in root for common doc files
-            for pattern in doc_patterns:
-                doc_files.extend(repo_path.glob(pattern))
+            doc_files.extend(self._scan_files(repo_path, matches, recursive=False))
             
             # Remove duplicates and filter
             unique_files = []
             seen = set()
             
-            for file_path in doc_files:
-                if file_path.resolve() not in seen:
-                    seen.add(file_path.resolve())
+            for file_path, size in doc_files:
+                resolved = file_path.resolve()
+                if resolved not in seen:
+                    seen.add(resolved)
                     # Skip very large files (>1MB) and binary files
-                    if file_path.stat().st_size < 1024 * 1024:
+                    if size < 1024 * 1024:
                         unique_files.append(file_path)
             
             logger.info(f"Found {len(unique_files)} documentation files")
@@ -118,10 +204,30 @@ class RepoManager:
             logger.error(f"Error finding documentation files: {e}")
             return []
     
-    def save_analysis_cache(self, analysis_results: List[AnalyzedDocument], repo_url: str):
+    @staticmethod
+    def _scan_files(root: Path, matches, recursive: bool) -> List[Tuple[Path, int]]:
+        """Collect (path, size) for files under root whose name satisfies matches, in one scandir walk"""
+        found = []
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Pruned before descending, so vendored trees are never listed
+                            if recursive and entry.name not in _EXCLUDED_DIRS:
+                                stack.append(directory / entry.name)
+                        elif entry.is_file() and matches(entry.name):
+                            found.append((directory / entry.name, entry.stat().st_size))
+            except OSError as e:
+                logger.warning(f"Skipping unreadable directory {directory}: {e}")
+        return found
+    
+    def save_analysis_cache(self, analysis_results: List[AnalyzedDocument], repo_url: str, commit: Optional[str] = None):
         """Save analysis results to cache"""
         try:
-            cache_path = self._get_analysis_cache_path(repo_url)
+            cache_path = self._get_analysis_cache_path(repo_url, commit)
             
             # Convert to serializable format
             cache_data = {
@@ -138,18 +244,21 @@ class RepoManager:
                 'timestamp': hashlib.md5(str(repo_url).encode()).hexdigest()
             }
             
-            with open(cache_path, 'wb') as f:
-                pickle.dump(cache_data, f)
+            # Write-then-rename so an interrupted save never leaves a truncated cache
+            temp_path = cache_path.with_name(f".{cache_path.name}.tmp")
+            with open(temp_path, 'wb') as f:
+                pickle.dump(cache_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
             
             logger.info(f"Saved analysis cache: {cache_path}")
             
         except Exception as e:
             logger.error(f"Error saving analysis cache: {e}")
     
-    def load_analysis_cache(self, repo_url: str) -> Optional[List[AnalyzedDocument]]:
+    def load_analysis_cache(self, repo_url: str, commit: Optional[str] = None) -> Optional[List[AnalyzedDocument]]:
         """Load analysis results from cache"""
         try:
-            cache_path = self._get_analysis_cache_path(repo_url)
+            cache_path = self._get_analysis_cache_path(repo_url, commit)
             
             if not cache_path.exists():
                 return None
@@ -188,21 +297,23 @@ class DocAnalyzer:
         """Extract metadata from document content"""
         
         # Extract title (first H1 or filename)
-        title_match = re.search(r'^# (.+)$', content, re.MULTILINE)
+        title_match = _TITLE_RE.search(content)
         title = title_match.group(1) if title_match else file_path.stem
         
         # Extract all headings
-        headings = re.findall(r'^#{1,6} (.+)$', content, re.MULTILINE)
+        headings = _HEADING_RE.findall(content)
         
         # Extract code blocks
         code_blocks = []
-        code_pattern = r'```(\w+)?\n(.*?)\n```'
-        for i, match in enumerate(re.finditer(code_pattern, content, re.DOTALL)):
+        lines_before = 0
+        scanned = 0
+        for i, match in enumerate(_CODE_BLOCK_RE.finditer(content)):
             language = match.group(1) or 'text'
             code_content = match.group(2)
             
-            # Calculate line numbers (approximate)
-            lines_before = content[:match.start()].count('\n')
+            # Calculate line numbers (approximate), counting only the text since the previous block
+            lines_before += content.count('\n', scanned, match.start())
+            scanned = match.start()
             lines_in_block = code_content.count('\n')
             
             code_blocks.append(CodeBlock(
@@ -213,7 +324,7 @@ class DocAnalyzer:
             ))
         
         # Extract links
-        links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
+        links = _LINK_RE.findall(content)
         link_urls = [link[1] for link in links]
         
         # Word count
@@ -263,25 +374,28 @@ class DocAnalyzer:
             summary=doc_summary
         )
     
-    def analyze_repository(self, file_paths: List[Path]) -> List[AnalyzedDocument]:
+    def _analyze_file(self, file_path: Path) -> Optional[AnalyzedDocument]:
+        """Read and analyze one file, returning None on failure"""
+        try:
+            # Binary read + one-shot decode skips TextIOWrapper's chunked decoding
+            with open(file_path, 'rb') as f:
+                content = f.read().decode('utf-8')
+            
+            analyzed_doc = self.analyze_document(file_path, content)
+            
+            logger.info(f"Analyzed {file_path}: {analyzed_doc.classification.doc_type} (confidence: {analyzed_doc.classification.confidence:.2f})")
+            return analyzed_doc
+            
+        except Exception as e:
+            logger.error(f"Error analyzing {file_path}: {e}")
+            return None
+    
+    def analyze_repository(self, file_paths: List[Path], max_workers: int = 8) -> List[AnalyzedDocument]:
         """Analyze all documents in a repository"""
-        analyzed_docs = []
-        
-        for file_path in file_paths:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                analyzed_doc = self.analyze_document(file_path, content)
-                analyzed_docs.append(analyzed_doc)
-                
-                logger.info(f"Analyzed {file_path}: {analyzed_doc.classification.doc_type} (confidence: {analyzed_doc.classification.confidence:.2f})")
-                
-            except Exception as e:
-                logger.error(f"Error analyzing {file_path}: {e}")
-                continue
-        
-        return analyzed_docs
+        # File reads and LLM calls are I/O-bound, so documents overlap on threads (results keep file order)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self._analyze_file, file_paths)
+            return [doc for doc in results if doc is not None]
     
     def get_classified_docs(self, analyzed_docs: List[AnalyzedDocument]) -> Dict[DocumentType, List[AnalyzedDocument]]:
         """Group analyzed documents by classification"""
@@ -679,6 +793,14 @@ class VectorDBManager:
         """Clear the entire database"""
         self.vector_db.clear_collection()
 
+# Minutes of study per retrieved chunk, by document type
+MODULE_TIME_ESTIMATES = {
+    "tutorial": 15,    # 15 minutes per tutorial chunk
+    "concept": 10,     # 10 minutes per concept chunk
+    "example": 8,      # 8 minutes per example chunk
+    "reference": 5     # 5 minutes per reference chunk
+}
+
 class PathBuilder:
     """Builds learning paths using LLM intelligence and vector search"""
     
@@ -688,9 +810,17 @@ class PathBuilder:
         self.module_discoverer = ModuleDiscoverer()
         self.module_orderer = ModuleOrderer()
         self.query_generator = QueryGenerator()
+        # analyzed_docs is fixed for the builder's lifetime, so the summary is built once
+        self._available_content_summary: Optional[str] = None
     
     def _create_available_content_summary(self) -> str:
-        """Create a brief summary of available content types"""
+        """Create a brief summary of available content types (computed once per builder)"""
+        if self._available_content_summary is None:
+            self._available_content_summary = self._build_available_content_summary()
+        return self._available_content_summary
+    
+    def _build_available_content_summary(self) -> str:
+        """Summarize document type counts and sample topics"""
         doc_types = {}
         sample_topics = set()
         
@@ -781,70 +911,77 @@ class PathBuilder:
                 docs_by_type[doc_type] = []
             docs_by_type[doc_type].append(doc)
         
-        summary_text = f"Available Documentation for Learning Path Creation:\n\n"
-        summary_text += f"Total Documents: {len(self.analyzed_docs)}\n\n"
+        # Parts are collected and joined once instead of re-copying a growing string
+        parts = [
+            f"Available Documentation for Learning Path Creation:\n\n",
+            f"Total Documents: {len(self.analyzed_docs)}\n\n"
+        ]
         
         # Add ALL documents organized by type - no limits
         for doc_type, docs in docs_by_type.items():
-            summary_text += f"{doc_type.upper()} DOCUMENTS ({len(docs)} total):\n"
+            parts.append(f"{doc_type.upper()} DOCUMENTS ({len(docs)} total):\n")
             
             # Include ALL documents - no truncation
-            for i, doc in enumerate(docs):
-                doc_context = f"""  {i+1}. Title: {doc.metadata.title or 'Untitled'}
+            parts.extend(
+                f"""  {i+1}. Title: {doc.metadata.title or 'Untitled'}
      Headings: {', '.join(doc.metadata.headings)}
      Summary: {doc.summary}
 """
-                summary_text += doc_context
+                for i, doc in enumerate(docs)
+            )
             
-            summary_text += "\n"
+            parts.append("\n")
         
-        return summary_text
+        return "".join(parts)
     
     def _create_content_overview_for_ordering(self, modules: List[str]) -> str:
         """Create complete content overview for module ordering"""
         
-        overview = f"Content Overview for Module Ordering:\n\n"
-        overview += f"Proposed Modules: {', '.join(modules)}\n\n"
+        parts = [
+            f"Content Overview for Module Ordering:\n\n",
+            f"Proposed Modules: {', '.join(modules)}\n\n"
+        ]
+        
+        # Search text and listing entry per document do not depend on the module, so build them once
+        doc_entries = [
+            (
+                f"{doc.metadata.title} {' '.join(doc.metadata.headings)} {doc.summary}".lower(),
+                f"  - {doc.classification.doc_type.value}: {doc.metadata.title}\n"
+                f"    Headings: {', '.join(doc.metadata.headings)}\n"
+                f"    Summary: {doc.summary}\n"
+            )
+            for doc in self.analyzed_docs
+        ]
         
         # For each proposed module, show ALL related content
         for module in modules:
-            overview += f"CONTENT AVAILABLE FOR '{module.upper()}':\n"
+            parts.append(f"CONTENT AVAILABLE FOR '{module.upper()}':\n")
             
             # Find ALL documents that might relate to this module
-            related_docs = []
-            for doc in self.analyzed_docs:
-                # Check if module name appears in title, headings, or summary
-                search_text = f"{doc.metadata.title} {' '.join(doc.metadata.headings)} {doc.summary}".lower()
-                if (module.lower() in search_text or 
-                    any(word in search_text for word in module.lower().split())):
-                    related_docs.append(doc)
+            # (module name appears in title, headings, or summary)
+            module_lower = module.lower()
+            module_words = module_lower.split()
+            related_entries = [
+                entry for search_text, entry in doc_entries
+                if module_lower in search_text or any(word in search_text for word in module_words)
+            ]
             
-            if related_docs:
+            if related_entries:
                 # Include ALL related docs - no limits
-                for doc in related_docs:
-                    overview += f"  - {doc.classification.doc_type.value}: {doc.metadata.title}\n"
-                    overview += f"    Headings: {', '.join(doc.metadata.headings)}\n"
-                    overview += f"    Summary: {doc.summary}\n"
+                parts.extend(related_entries)
             else:
-                overview += f"  - No directly related content found for this module\n"
+                parts.append(f"  - No directly related content found for this module\n")
             
-            overview += "\n"
+            parts.append("\n")
         
-        return overview
+        return "".join(parts)
     
     def _estimate_module_time(self, content: Dict[str, List[str]]) -> int:
         """Estimate time for a module based on content"""
         
-        time_estimates = {
-            "tutorial": 15,    # 15 minutes per tutorial chunk
-            "concept": 10,     # 10 minutes per concept chunk
-            "example": 8,      # 8 minutes per example chunk
-            "reference": 5     # 5 minutes per reference chunk
-        }
-        
         total_time = 0
         for doc_type, chunks in content.items():
-            total_time += len(chunks) * time_estimates.get(doc_type, 10)
+            total_time += len(chunks) * MODULE_TIME_ESTIMATES.get(doc_type, 10)
         
         return max(total_time, 15)  # Minimum 15 minutes per module
     
@@ -7,6 +7,7 @@ import logging
 import json
 import re
 from collections import defaultdict
+from itertools import islice
 from urllib.parse import urlparse
 
 from .models import (
@@ -21,9 +22,11 @@ logger = logging.getLogger(__name__)
 CHUNK_SIZE = 3000
 CHUNK_OVERLAP = 100
 
+_WORD_RE = re.compile(r'\S+')
+
 def truncate_num_words(text: str, num_words: int = 3000):
-    words = text.split()
-    return ' '.join(words[:num_words])
+    # Stops scanning at the cutoff instead of splitting the whole text into words
+    return ' '.join(match.group() for match in islice(_WORD_RE.finditer(text), num_words))
 
 class FallbackParser:
     @staticmethod
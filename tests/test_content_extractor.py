@@ -0,0 +1,63 @@
+"""Basic metadata extraction (frontmatter, title, headings) without the LLM."""
+from pathlib import Path
+
+from course_content_agent.modules import ContentExtractor
+
+
+def _extract(content, filename="getting-started.md"):
+    return ContentExtractor.extract_basic_metadata(content, Path("docs") / filename)
+
+
+def test_frontmatter_title_and_body():
+    meta = _extract("---\ntitle: Install\ntags: [setup]\n---\n# Heading\n\nBody\n")
+
+    assert meta["title"] == "Install"
+    assert meta["frontmatter"] == {"title": "Install", "tags": ["setup"]}
+    assert meta["headings"] == ["# Heading"]
+
+
+def test_frontmatter_only_file_without_trailing_newline():
+    meta = _extract("---\ntitle: Only frontmatter\n---")
+
+    assert meta["title"] == "Only frontmatter"
+    assert meta["headings"] == []
+
+
+def test_crlf_frontmatter():
+    meta = _extract("---\r\ntitle: Windows\r\n---\r\n# H1\r\n")
+
+    assert meta["title"] == "Windows"
+
+
+def test_non_mapping_frontmatter_is_ignored():
+    meta = _extract("---\n- just\n- a list\n---\n# From H1\n")
+
+    assert meta["frontmatter"] == {}
+    assert meta["title"] == "From H1"
+
+
+def test_invalid_yaml_is_ignored():
+    meta = _extract("---\ntitle: [unclosed\n---\n# From H1\n")
+
+    assert meta["frontmatter"] == {}
+    assert meta["title"] == "From H1"
+
+
+def test_non_string_titles():
+    assert _extract("---\ntitle: 2024\n---\n# H1\n")["title"] == "2024"
+    assert _extract("---\ntitle: {en: Hello}\n---\n# From H1\n")["title"] == "From H1"
+    assert _extract("---\ntitle:\n---\n")["title"] == "Getting Started"
+
+
+def test_closing_marker_must_end_its_line():
+    meta = _extract("---\ntitle: Not closed\n----\n# From H1\n")
+
+    assert meta["frontmatter"] == {}
+    assert meta["title"] == "From H1"
+
+
+def test_headings_inside_code_blocks_are_skipped():
+    meta = _extract("# Title\n\n```bash\n# not a heading\n```\n\n## Section\n")
+
+    assert meta["headings"] == ["# Title", "## Section"]
+    assert meta["code_blocks"][0]["language"] == "bash"
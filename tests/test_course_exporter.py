@@ -0,0 +1,103 @@
+"""Markdown export of a generated course, including failure cleanup."""
+import json
+
+import pytest
+
+from course_content_agent.models import GeneratedCourse, ModuleContent
+from course_content_agent.modules import CourseExporter
+
+MODULE_FILES = ["01_intro.md", "02_main.md", "03_conclusion.md", "04_assessments.md", "05_summary.md"]
+
+
+def _make_course(module_count=2, course_id="docs_beginner"):
+    module_list = [
+        ModuleContent(
+            module_id=f"module_{i:02d}",
+            title=f"Module {i}",
+            description="description",
+            learning_objectives=["objective"],
+            introduction=f"intro {i} ✓",
+            main_content="main " * 100,
+            conclusion="conclusion",
+            assessment="assessment",
+            summary="summary",
+        )
+        for i in range(module_count)
+    ]
+    return GeneratedCourse(
+        course_id=course_id,
+        title="Course",
+        description="description",
+        welcome_message="welcome",
+        modules=module_list,
+        course_conclusion="goodbye",
+    )
+
+
+def _files(root):
+    return sorted(path.relative_to(root).as_posix() for path in root.rglob("*") if path.is_file())
+
+
+def test_export_layout_and_content(tmp_path):
+    assert CourseExporter().export_to_markdown(_make_course(), str(tmp_path))
+
+    course_dir = tmp_path / "beginner"
+    assert _files(tmp_path) == sorted(
+        ["beginner/00_welcome.md", "beginner/99_conclusion.md", "beginner/course_info.json"]
+        + [f"beginner/module_{i:02d}/{name}" for i in (1, 2) for name in MODULE_FILES]
+    )
+    assert (course_dir / "module_01" / "01_intro.md").read_text(encoding="utf-8") == "intro 0 ✓"
+    info = json.loads((course_dir / "course_info.json").read_text(encoding="utf-8"))
+    assert [module["module_id"] for module in info["modules"]] == ["module_01", "module_02"]
+    assert info["modules"][0]["files"] == MODULE_FILES
+
+
+def test_unknown_complexity_exports_to_default(tmp_path):
+    assert CourseExporter().export_to_markdown(_make_course(1, course_id="docs_expert"), str(tmp_path))
+
+    assert (tmp_path / "default" / "00_welcome.md").exists()
+
+
+def test_reexport_overwrites_in_place(tmp_path):
+    exporter = CourseExporter()
+    assert exporter.export_to_markdown(_make_course(), str(tmp_path))
+    course = _make_course()
+    course.welcome_message = "updated"
+
+    assert exporter.export_to_markdown(course, str(tmp_path))
+
+    assert (tmp_path / "beginner" / "00_welcome.md").read_text(encoding="utf-8") == "updated"
+    assert not any(name.endswith(".tmp") for name in _files(tmp_path))
+
+
+@pytest.mark.parametrize("failing_file", ["00_welcome.md", "03_conclusion.md", "course_info.json"])
+def test_failed_staging_publishes_nothing_and_leaves_no_temp_files(tmp_path, monkeypatch, failing_file):
+    stage_file = CourseExporter._stage_file
+
+    def failing_stage(self, path, content):
+        if str(path).endswith(failing_file):
+            raise OSError("disk full")
+        return stage_file(self, path, content)
+
+    monkeypatch.setattr(CourseExporter, "_stage_file", failing_stage)
+
+    assert not CourseExporter().export_to_markdown(_make_course(), str(tmp_path))
+    assert _files(tmp_path) == []
+
+
+def test_failed_staging_keeps_previous_export(tmp_path, monkeypatch):
+    assert CourseExporter().export_to_markdown(_make_course(), str(tmp_path))
+    before = {name: (tmp_path / name).read_bytes() for name in _files(tmp_path)}
+    stage_file = CourseExporter._stage_file
+
+    def failing_stage(self, path, content):
+        if str(path).endswith("99_conclusion.md"):
+            raise OSError("disk full")
+        return stage_file(self, path, content)
+
+    monkeypatch.setattr(CourseExporter, "_stage_file", failing_stage)
+    course = _make_course()
+    course.welcome_message = "never published"
+
+    assert not CourseExporter().export_to_markdown(course, str(tmp_path))
+    assert {name: (tmp_path / name).read_bytes() for name in _files(tmp_path)} == before
@@ -0,0 +1,186 @@
+"""Failure handling in CourseGenerator module generation (no LLM calls are made)."""
+import asyncio
+import types
+
+import pytest
+
+from course_content_agent import modules
+from course_content_agent.models import (
+    AssessmentPoint,
+    ComplexityLevel,
+    DocumentTree,
+    GroupedLearningPath,
+    LearningModule,
+    ModuleContent,
+)
+from course_content_agent.modules import CourseGenerator
+
+
+class RateLimitError(Exception):
+    """Stands in for the provider's 429 error (matched by class name, like litellm's)."""
+
+
+def _make_pathway(module_count=1):
+    module_list = [
+        LearningModule(
+            module_id=f"m{i}",
+            title=f"Module {i}",
+            theme="theme",
+            description="description",
+            documents=[],
+            learning_objectives=["objective"],
+            assessment=AssessmentPoint(assessment_id=f"a{i}", title="Check", concepts_to_assess=["concept"]),
+        )
+        for i in range(module_count)
+    ]
+    return GroupedLearningPath(
+        pathway_id="docs_beginner",
+        title="Course",
+        description="description",
+        target_complexity=ComplexityLevel.BEGINNER,
+        modules=module_list,
+        welcome_message="welcome",
+    )
+
+
+def _make_tree():
+    return DocumentTree(
+        repo_url="https://example.com/docs",
+        repo_name="docs",
+        root_path="/tmp/docs",
+        nodes={},
+        tree_structure={},
+        cross_references={},
+    )
+
+
+def _module_content(module, module_index):
+    return ModuleContent(
+        module_id=f"module_{module_index:02d}",
+        title=module.title,
+        description=module.description,
+        introduction="intro",
+        main_content="main",
+        conclusion="conclusion",
+        assessment="assessment",
+        summary="summary",
+    )
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(modules.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def test_rate_limited_module_is_retried_after_backoff(sleeps):
+    generator = CourseGenerator()
+    attempts = []
+
+    def generate(module, pathway, tree, overview_context, module_index):
+        attempts.append(module.title)
+        if len(attempts) < 3:
+            raise RateLimitError("429 Too Many Requests")
+        return _module_content(module, module_index)
+
+    generator._generate_module_content = generate
+    contents = asyncio.run(generator._generate_modules_async(_make_pathway(), _make_tree(), ""))
+
+    assert [content.module_id for content in contents] == ["module_00"]
+    assert len(attempts) == 3
+    assert sleeps == [1, 2]
+
+
+def test_rate_limit_retries_are_bounded(sleeps):
+    generator = CourseGenerator()
+    generator.max_rate_limit_retries = 2
+
+    def generate(*args):
+        raise RateLimitError("429 Too Many Requests")
+
+    generator._generate_module_content = generate
+    with pytest.raises(RateLimitError):
+        asyncio.run(generator._generate_modules_async(_make_pathway(), _make_tree(), ""))
+    assert sleeps == [1, 2]
+
+
+def test_other_errors_are_not_retried(sleeps):
+    generator = CourseGenerator()
+
+    def generate(*args):
+        raise RuntimeError("boom")
+
+    generator._generate_module_content = generate
+    with pytest.raises(RuntimeError):
+        asyncio.run(generator._generate_modules_async(_make_pathway(), _make_tree(), ""))
+    assert sleeps == []
+
+
+def _stub_generators(generator, combined):
+    """Point every generator at a stub; returns the names of fallback generators that ran."""
+    fallback_calls = []
+    generator.module_components_generator = combined
+    for attr, field in (
+        ("intro_generator", "introduction"),
+        ("main_content_generator", "main_content"),
+        ("conclusion_generator", "conclusion"),
+        ("assessment_content_generator", "assessment_content"),
+        ("summary_generator", "summary"),
+    ):
+        def fallback(attr=attr, field=field, **inputs):
+            fallback_calls.append(attr)
+            return types.SimpleNamespace(**{field: f"{field} (fallback)"})
+        setattr(generator, attr, fallback)
+    return fallback_calls
+
+
+def test_rate_limit_on_combined_call_skips_fallbacks():
+    generator = CourseGenerator()
+
+    def combined(**inputs):
+        raise RateLimitError("429 Too Many Requests")
+
+    fallback_calls = _stub_generators(generator, combined)
+    pathway = _make_pathway()
+    with pytest.raises(RateLimitError):
+        generator._generate_module_content(pathway.modules[0], pathway, _make_tree(), "", 0)
+    assert fallback_calls == []
+
+
+def test_unparseable_combined_output_falls_back_per_component():
+    generator = CourseGenerator()
+
+    def combined(**inputs):
+        raise ValueError("Expected output fields were not found in the response")
+
+    fallback_calls = _stub_generators(generator, combined)
+    pathway = _make_pathway()
+    content = generator._generate_module_content(pathway.modules[0], pathway, _make_tree(), "", 0)
+
+    assert len(fallback_calls) == 5
+    assert content.introduction == "introduction (fallback)"
+    assert content.assessment == "assessment_content (fallback)"
+
+
+def test_only_empty_components_fall_back():
+    generator = CourseGenerator()
+
+    def combined(**inputs):
+        return types.SimpleNamespace(
+            introduction="intro", main_content="main", conclusion="  ",
+            assessment_content="assessment", summary=None,
+        )
+
+    fallback_calls = _stub_generators(generator, combined)
+    pathway = _make_pathway()
+    content = generator._generate_module_content(pathway.modules[0], pathway, _make_tree(), "", 0)
+
+    assert fallback_calls == ["conclusion_generator", "summary_generator"]
+    assert content.main_content == "main"
+    assert content.summary == "summary (fallback)"
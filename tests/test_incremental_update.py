@@ -0,0 +1,161 @@
+"""Incremental refresh of a cached document tree against the current sources."""
+import pytest
+
+from course_content_agent import main
+from course_content_agent.main import CourseBuilder
+from course_content_agent.models import DocumentMetadata, DocumentNode, DocumentTree
+
+CACHED = {
+    "docs/intro.md": "h-intro",
+    "docs/guide.md": "h-guide",
+    "docs/old.md": "h-old",
+}
+
+
+def _node(path, title):
+    return DocumentNode(
+        id=path,
+        path=path,
+        filename=path.rsplit("/", 1)[-1],
+        content=f"# {title}",
+        metadata=DocumentMetadata(title=title, headings=[], code_blocks=[], frontmatter={}),
+    )
+
+
+def _make_tree():
+    return DocumentTree(
+        repo_url="https://example.com/docs",
+        repo_name="docs",
+        root_path="/tmp/docs",
+        nodes={path: _node(path, "cached") for path in CACHED},
+        tree_structure={},
+        cross_references={},
+        learning_paths=[["docs/intro.md", "docs/guide.md"]],
+    )
+
+
+def _raw(path, content_hash):
+    return {"success": True, "relative_path": path, "content_hash": content_hash}
+
+
+@pytest.fixture
+def builder(monkeypatch):
+    """A builder whose LLM analysis is faked; paths in llm_failures fall back to basic metadata."""
+    # Only the analysis path is exercised, so the repo, cache and generator setup is skipped
+    builder = CourseBuilder.__new__(CourseBuilder)
+    builder.max_workers = 4
+    builder.llm_failures = set()
+    builder.analyzed_paths = []
+
+    def fake_analyze(args):
+        result, _, _ = args
+        path = result["relative_path"]
+        builder.analyzed_paths.append(path)
+        llm_success = path not in builder.llm_failures
+        node = _node(path, "analyzed" if llm_success else "basic")
+        return {
+            "success": True,
+            "llm_success": llm_success,
+            "relative_path": path,
+            "node_data": node.model_dump(),
+            "error_msg": None if llm_success else "LLM unavailable",
+        }
+
+    monkeypatch.setattr(main, "analyze_document", fake_analyze)
+    return builder
+
+
+def _update(builder, tree, raw_results, skip_llm=False, batch_size=50):
+    return builder._update_changed_documents(tree, raw_results, dict(CACHED), batch_size, skip_llm, "")
+
+
+def test_unchanged_tree_is_left_alone(builder):
+    tree = _make_tree()
+    raw_results = [_raw(path, digest) for path, digest in CACHED.items()]
+
+    assert _update(builder, tree, raw_results) is None
+    assert builder.analyzed_paths == []
+    assert tree.learning_paths
+
+
+@pytest.mark.parametrize("batch_size", [0, 2])
+def test_changed_removed_and_new_documents(builder, batch_size):
+    tree = _make_tree()
+    raw_results = [
+        _raw("docs/intro.md", "h-intro"),
+        _raw("docs/guide.md", "h-guide-v2"),
+        _raw("docs/new.md", "h-new"),
+    ]
+
+    manifest = _update(builder, tree, raw_results, batch_size=batch_size)
+
+    assert manifest == {"docs/intro.md": "h-intro", "docs/guide.md": "h-guide-v2", "docs/new.md": "h-new"}
+    assert sorted(builder.analyzed_paths) == ["docs/guide.md", "docs/new.md"]
+    assert sorted(tree.nodes) == ["docs/guide.md", "docs/intro.md", "docs/new.md"]
+    assert tree.nodes["docs/intro.md"].metadata.title == "cached"
+    assert tree.nodes["docs/guide.md"].metadata.title == "analyzed"
+    assert tree.learning_paths == []
+
+
+def test_removed_only(builder):
+    tree = _make_tree()
+    raw_results = [_raw("docs/intro.md", "h-intro"), _raw("docs/guide.md", "h-guide")]
+
+    manifest = _update(builder, tree, raw_results)
+
+    assert manifest == {"docs/intro.md": "h-intro", "docs/guide.md": "h-guide"}
+    assert "docs/old.md" not in tree.nodes
+    assert builder.analyzed_paths == []
+    assert tree.learning_paths == []
+
+
+def test_skip_llm_leaves_changes_pending(builder):
+    tree = _make_tree()
+    raw_results = [_raw(path, digest) for path, digest in CACHED.items()]
+    raw_results[1] = _raw("docs/guide.md", "h-guide-v2")
+    raw_results.append(_raw("docs/new.md", "h-new"))
+
+    assert _update(builder, tree, raw_results, skip_llm=True) is None
+    assert builder.analyzed_paths == []
+    assert "docs/new.md" not in tree.nodes
+    assert tree.learning_paths
+
+
+def test_skip_llm_still_drops_removed_documents(builder):
+    tree = _make_tree()
+    raw_results = [_raw("docs/intro.md", "h-intro"), _raw("docs/guide.md", "h-guide-v2")]
+
+    manifest = _update(builder, tree, raw_results, skip_llm=True)
+
+    # The changed guide keeps its old hash so a later run with LLM analysis rebuilds it
+    assert manifest == {"docs/intro.md": "h-intro", "docs/guide.md": "h-guide"}
+    assert "docs/old.md" not in tree.nodes
+    assert tree.learning_paths == []
+
+
+def test_llm_fallback_is_not_counted_as_rebuilt(builder):
+    tree = _make_tree()
+    builder.llm_failures = {"docs/guide.md"}
+    raw_results = [_raw(path, digest) for path, digest in CACHED.items()]
+    raw_results[1] = _raw("docs/guide.md", "h-guide-v2")
+
+    assert _update(builder, tree, raw_results) is None
+    assert builder.analyzed_paths == ["docs/guide.md"]
+    assert tree.learning_paths
+
+
+def test_llm_fallback_keeps_old_hash_next_to_rebuilt_documents(builder):
+    tree = _make_tree()
+    builder.llm_failures = {"docs/guide.md", "docs/new.md"}
+    raw_results = [
+        _raw("docs/intro.md", "h-intro-v2"),
+        _raw("docs/guide.md", "h-guide-v2"),
+        _raw("docs/new.md", "h-new"),
+    ]
+
+    manifest = _update(builder, tree, raw_results)
+
+    # Fallbacks keep their old hash (a new document gets none), so the next run retries them
+    assert manifest == {"docs/intro.md": "h-intro-v2", "docs/guide.md": "h-guide"}
+    assert tree.nodes["docs/guide.md"].metadata.title == "basic"
+    assert tree.learning_paths == []
@@ -0,0 +1,179 @@
+"""In-process and on-disk caches of LLM outputs (no LLM calls are made)."""
+import os
+import threading
+import time
+import types
+
+import pytest
+
+from course_content_agent.modules import ResponseCache, SingleFlightMemo, prune_cache_dir
+
+FIELDS = ("introduction", "summary")
+
+
+def test_memo_calls_once_per_key():
+    memo = SingleFlightMemo()
+    calls = []
+
+    assert memo.get("a", lambda: calls.append("a") or 1) == 1
+    assert memo.get("a", lambda: calls.append("a again") or 2) == 1
+    assert calls == ["a"]
+    assert (memo.hits, memo.misses) == (1, 1)
+
+
+def test_memo_waiters_share_the_in_flight_call():
+    memo = SingleFlightMemo()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append("slow")
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(memo.get("k", slow)))
+    owner.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(memo.get("k", slow)))
+    waiter.start()
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert results == ["result", "result"]
+    assert calls == ["slow"]
+
+
+def test_memo_does_not_keep_failures():
+    memo = SingleFlightMemo()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        memo.get("k", fail)
+    assert memo.get("k", lambda: "ok") == "ok"
+
+
+def test_memo_evicts_least_recently_used():
+    memo = SingleFlightMemo(max_entries=2)
+    memo.get("a", lambda: 1)
+    memo.get("b", lambda: 2)
+    memo.get("a", lambda: None)  # refreshes "a"
+    memo.get("c", lambda: 3)  # evicts "b"
+
+    assert memo.get("a", lambda: "recomputed") == 1
+    assert memo.get("b", lambda: "recomputed") == "recomputed"
+
+
+class CountingGenerator:
+    """Stands in for a DSPy predictor; every call is an LLM round-trip."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, **inputs):
+        self.calls += 1
+        return types.SimpleNamespace(introduction=f"intro {self.calls}", summary=f"summary {self.calls}")
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    return ResponseCache(tmp_path / "llm_responses")
+
+
+def _entries(cache):
+    return sorted(path.name for path in cache.cache_dir.iterdir())
+
+
+def test_response_cache_hit_across_whitespace_only_change(response_cache):
+    generator = CountingGenerator()
+
+    first = response_cache.call("module_intro", generator, FIELDS, module_title="Setup", source="Install  the\n\ntool.")
+    second = response_cache.call("module_intro", generator, FIELDS, module_title="Setup", source="Install the tool.\n")
+
+    assert first == second == {"introduction": "intro 1", "summary": "summary 1"}
+    assert generator.calls == 1
+    assert (response_cache.hits, response_cache.misses) == (1, 1)
+    assert len(_entries(response_cache)) == 1
+
+
+def test_response_cache_miss_on_content_or_code_indentation_change(response_cache):
+    generator = CountingGenerator()
+    code = "```python\nif x:\n    y()\n```"
+
+    response_cache.call("module_intro", generator, FIELDS, source=f"Intro\n{code}")
+    response_cache.call("module_intro", generator, FIELDS, source=f"Intro\n{code.replace('    ', '  ')}")
+    response_cache.call("module_intro", generator, FIELDS, source="Different text")
+    response_cache.call("module_summary", generator, FIELDS, source="Different text")
+
+    assert generator.calls == 4
+    assert response_cache.hits == 0
+
+
+@pytest.mark.parametrize("payload", [
+    b"",
+    b"{\"introduction\": \"cut off",
+    b"\xff\xfe not json",
+    b"[\"not\", \"a\", \"mapping\"]",
+    b"{\"introduction\": \"only one field\"}",
+    b"\x28\xb5\x2f\xfd truncated zstd frame",
+])
+def test_response_cache_corrupt_or_partial_entry_is_a_miss(response_cache, payload):
+    generator = CountingGenerator()
+    inputs = {"module_title": "Setup"}
+    (response_cache.cache_dir / f"{response_cache.key('module_intro', inputs)}.json").write_bytes(payload)
+
+    outputs = response_cache.call("module_intro", generator, FIELDS, **inputs)
+
+    assert outputs == {"introduction": "intro 1", "summary": "summary 1"}
+    assert (response_cache.hits, response_cache.misses) == (0, 1)
+    # The regenerated entry replaces the bad one and is served from then on
+    assert response_cache.call("module_intro", generator, FIELDS, **inputs) == outputs
+    assert generator.calls == 1
+    assert not any(name.endswith(".tmp") for name in _entries(response_cache))
+
+
+def _write_aged(path, size, age_days):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+
+
+def test_prune_removes_least_recently_used_first(tmp_path):
+    for name, age_days in (("newest", 1), ("middle", 2), ("oldest", 3), ("nested/older", 2.5)):
+        _write_aged(tmp_path / name, 100, age_days)
+
+    assert prune_cache_dir(tmp_path, max_bytes=200, max_age_days=30) == (2, 200)
+    assert sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*") if p.is_file()) == ["middle", "newest"]
+
+
+def test_prune_removes_expired_files_even_under_the_size_limit(tmp_path):
+    _write_aged(tmp_path / "fresh", 10, 1)
+    _write_aged(tmp_path / "stale", 10, 40)
+
+    assert prune_cache_dir(tmp_path, max_bytes=10 ** 6, max_age_days=30) == (1, 10)
+    assert [p.name for p in tmp_path.iterdir()] == ["fresh"]
+
+
+def test_prune_missing_directory(tmp_path):
+    assert prune_cache_dir(tmp_path / "missing") == (0, 0)
+
+
+def test_response_cache_hit_protects_entry_from_pruning(response_cache):
+    generator = CountingGenerator()
+    response_cache.call("module_intro", generator, FIELDS, module_title="kept")
+    response_cache.call("module_intro", generator, FIELDS, module_title="evicted")
+    paths = {path.name: path for path in response_cache.cache_dir.iterdir()}
+    old = time.time() - 3600
+    for path in paths.values():
+        os.utime(path, (old, old))
+
+    response_cache.call("module_intro", generator, FIELDS, module_title="kept")
+    size = max(path.stat().st_size for path in paths.values())
+    prune_cache_dir(response_cache.cache_dir, max_bytes=size, max_age_days=30)
+
+    assert _entries(response_cache) == [f"{response_cache.key('module_intro', {'module_title': 'kept'})}.json"]
@@ -0,0 +1,128 @@
+"""Commit resolution and the per-commit analysis cache of the RAG agent's RepoManager."""
+import pickle
+
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("openai")
+
+from rag_course_content_agent.managers import RepoManager  # noqa: E402
+from rag_course_content_agent.models import (  # noqa: E402
+    AnalyzedDocument,
+    CodeBlock,
+    DependencyRelation,
+    DocumentClassification,
+    DocumentMetadata,
+    DocumentType,
+)
+
+REPO_URL = "https://github.com/example/docs"
+LOCAL = "1" * 40
+REMOTE = "2" * 40
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return RepoManager(str(tmp_path / "cache"))
+
+
+def _heads(monkeypatch, manager, local, remote):
+    """Fake the local clone and `git ls-remote`; returns the list of remote lookups."""
+    lookups = []
+
+    def remote_head(repo_url):
+        lookups.append(repo_url)
+        return remote
+
+    monkeypatch.setattr(manager, "get_local_head", lambda repo_path: local)
+    monkeypatch.setattr(manager, "get_remote_head", remote_head)
+    return lookups
+
+
+def test_cached_head_prefers_remote(monkeypatch, manager):
+    lookups = _heads(monkeypatch, manager, LOCAL, REMOTE)
+
+    assert manager.get_cached_head(REPO_URL) == REMOTE
+    assert lookups == [REPO_URL]
+
+
+def test_cached_head_trusts_local_clone_without_remote_check(monkeypatch, manager):
+    lookups = _heads(monkeypatch, manager, LOCAL, REMOTE)
+
+    assert manager.get_cached_head(REPO_URL, check_remote=False) == LOCAL
+    assert lookups == []
+
+
+def test_cached_head_falls_back_to_local_when_offline(monkeypatch, manager):
+    _heads(monkeypatch, manager, LOCAL, None)
+
+    assert manager.get_cached_head(REPO_URL) == LOCAL
+
+
+def test_cached_head_without_clone_asks_remote(monkeypatch, manager):
+    lookups = _heads(monkeypatch, manager, None, REMOTE)
+
+    assert manager.get_cached_head(REPO_URL, check_remote=False) == REMOTE
+    assert lookups == [REPO_URL]
+
+
+def test_cached_head_unknown(monkeypatch, manager):
+    _heads(monkeypatch, manager, None, None)
+
+    assert manager.get_cached_head(REPO_URL) is None
+
+
+def _analyzed(path="docs/intro.md"):
+    return AnalyzedDocument(
+        metadata=DocumentMetadata(
+            file_path=path,
+            title="Intro",
+            headings=["Intro"],
+            code_blocks=[CodeBlock(language="python", content="print(1)", line_start=3, line_end=5)],
+        ),
+        classification=DocumentClassification(
+            file_path=path, doc_type=DocumentType.TUTORIAL, confidence=0.9, reasoning="steps"
+        ),
+        content="# Intro\n",
+        dependencies=[DependencyRelation(concept="intro", confidence=0.5, evidence="text")],
+        summary="An introduction",
+    )
+
+
+def test_analysis_cache_round_trip_per_commit(manager):
+    docs = [_analyzed(), _analyzed("docs/guide.md")]
+    manager.save_analysis_cache(docs, REPO_URL, LOCAL)
+
+    assert manager.load_analysis_cache(REPO_URL, LOCAL) == docs
+    assert manager.load_analysis_cache(REPO_URL, REMOTE) is None
+    assert manager.load_analysis_cache(REPO_URL) is None
+    assert sorted(path.name for path in manager.cache_dir.iterdir()) == [
+        f"example_docs_{LOCAL[:12]}_analysis.pkl"
+    ]
+
+
+def test_analysis_cache_without_commit(manager):
+    manager.save_analysis_cache([_analyzed()], REPO_URL)
+
+    assert manager.load_analysis_cache(REPO_URL) == [_analyzed()]
+    assert manager.load_analysis_cache(REPO_URL, LOCAL) is None
+
+
+@pytest.mark.parametrize("payload", [
+    b"",
+    b"not a pickle",
+    pickle.dumps({"timestamp": "no results"}),
+    pickle.dumps({"analysis_results": [{"metadata": {"file_path": "docs/intro.md"}}]}),
+])
+def test_corrupt_or_partial_analysis_cache_is_a_miss(manager, payload):
+    manager._get_analysis_cache_path(REPO_URL, LOCAL).write_bytes(payload)
+
+    assert manager.load_analysis_cache(REPO_URL, LOCAL) is None
+
+
+def test_analysis_cache_save_replaces_previous_entry(manager):
+    manager.save_analysis_cache([_analyzed()], REPO_URL, LOCAL)
+    manager.save_analysis_cache([_analyzed("docs/guide.md")], REPO_URL, LOCAL)
+
+    assert manager.load_analysis_cache(REPO_URL, LOCAL) == [_analyzed("docs/guide.md")]
+    assert not any(path.name.endswith(".tmp") for path in manager.cache_dir.iterdir())
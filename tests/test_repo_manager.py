@@ -0,0 +1,58 @@
+"""Documentation discovery in a local checkout (no git operations)."""
+import pytest
+
+from course_content_agent.modules import RepoManager
+
+FILES = [
+    "README.md",
+    "LICENSE.md",
+    "docs/index.md",
+    "docs/guide/setup.mdx",
+    "docs/notes.txt",
+    "docs/node_modules/pkg/README.md",
+    "docs/tests/fixture.md",
+    "tests/docs/sample.md",
+    "build/out.md",
+    "guides/intro.md",
+]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo_path = tmp_path / "repo"
+    for name in FILES:
+        path = repo_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("# Doc\n", encoding="utf-8")
+    return repo_path
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return RepoManager(str(tmp_path / "cache"))
+
+
+def _relative(repo, files):
+    return sorted(path.relative_to(repo).as_posix() for path in files)
+
+
+def test_whole_repository(manager, repo):
+    assert _relative(repo, manager.find_documentation_files(repo)) == [
+        "README.md", "docs/guide/setup.mdx", "docs/index.md", "guides/intro.md",
+    ]
+
+
+def test_include_folders_prune_excluded_directories(manager, repo):
+    found = manager.find_documentation_files(repo, include_folders=["docs/", "."])
+
+    assert _relative(repo, found) == ["README.md", "docs/guide/setup.mdx", "docs/index.md"]
+
+
+def test_include_folder_inside_excluded_directory_is_skipped(manager, repo):
+    assert manager.find_documentation_files(repo, include_folders=["tests/docs", "build"]) == []
+
+
+def test_missing_include_folder_is_skipped(manager, repo):
+    found = manager.find_documentation_files(repo, include_folders=["missing", "guides"])
+
+    assert _relative(repo, found) == ["guides/intro.md"]
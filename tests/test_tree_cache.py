@@ -0,0 +1,124 @@
+"""Round-trip tests for the split document tree cache (metadata blob + content store)."""
+import os
+import pickle
+
+import pytest
+
+from course_content_agent.models import DocumentMetadata, DocumentNode, DocumentTree
+from course_content_agent.modules import hash_key, load_tree_content, read_tree_cache, write_tree_cache
+
+
+def _make_tree(contents):
+    nodes = {
+        path: DocumentNode(
+            id=hash_key(path),
+            path=path,
+            filename=path.rsplit("/", 1)[-1],
+            content=content,
+            metadata=DocumentMetadata(
+                title=path, headings=["# Title"], code_blocks=[], frontmatter={}
+            ),
+        )
+        for path, content in contents.items()
+    }
+    return DocumentTree(
+        repo_url="https://example.com/docs",
+        repo_name="docs",
+        root_path="/tmp/docs",
+        nodes=nodes,
+        tree_structure={},
+        cross_references={},
+    )
+
+
+CONTENTS = {
+    "docs/intro.md": "# Intro\n\nWelcome.\n",
+    "docs/guide.md": "# Guide\n\n```python\ndef f():\n    return 1\n```\n",
+    "docs/api.md": "# API\n\nÜnïcode survives the round trip.\n",
+}
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "docs_document_tree.pkl"
+
+
+def test_round_trip_with_content(cache_path):
+    write_tree_cache(_make_tree(CONTENTS), cache_path)
+
+    tree = read_tree_cache(cache_path)
+
+    assert {path: node.content for path, node in tree.nodes.items()} == CONTENTS
+    assert tree.nodes["docs/guide.md"].metadata.headings == ["# Title"]
+
+
+def test_metadata_only_load_leaves_content_empty(cache_path):
+    write_tree_cache(_make_tree(CONTENTS), cache_path)
+
+    tree = read_tree_cache(cache_path, load_content=False)
+
+    assert set(tree.nodes) == set(CONTENTS)
+    assert all(node.content == "" for node in tree.nodes.values())
+    assert tree.nodes["docs/api.md"].metadata.title == "docs/api.md"
+
+
+def test_partial_content_load(cache_path):
+    write_tree_cache(_make_tree(CONTENTS), cache_path)
+    tree = read_tree_cache(cache_path, load_content=False)
+
+    load_tree_content(tree, cache_path, paths={"docs/guide.md", "docs/missing.md"})
+
+    assert tree.nodes["docs/guide.md"].content == CONTENTS["docs/guide.md"]
+    assert tree.nodes["docs/intro.md"].content == ""
+    assert tree.nodes["docs/api.md"].content == ""
+
+
+def test_rewrite_keeps_stored_content_of_unloaded_nodes(cache_path):
+    write_tree_cache(_make_tree(CONTENTS), cache_path)
+    tree = read_tree_cache(cache_path, load_content=False)
+
+    write_tree_cache(tree, cache_path)
+
+    assert {path: node.content for path, node in read_tree_cache(cache_path).nodes.items()} == CONTENTS
+
+
+def test_legacy_plain_pickle(cache_path):
+    tree = _make_tree(CONTENTS)
+    cache_path.write_bytes(pickle.dumps(tree))
+
+    loaded = read_tree_cache(cache_path)
+
+    assert {path: node.content for path, node in loaded.nodes.items()} == CONTENTS
+
+
+def test_rewrite_deletes_content_of_removed_nodes(cache_path):
+    tree = _make_tree(CONTENTS)
+    write_tree_cache(tree, cache_path)
+
+    del tree.nodes["docs/api.md"]
+    write_tree_cache(tree, cache_path)
+
+    stored = {entry.name.split(".", 1)[0] for entry in cache_path.with_suffix(".content").iterdir()}
+    assert stored == {hash_key("docs/intro.md"), hash_key("docs/guide.md")}
+
+
+def test_failed_rewrite_keeps_previous_tree(cache_path, monkeypatch):
+    write_tree_cache(_make_tree(CONTENTS), cache_path)
+    previous = cache_path.read_bytes()
+
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        write_tree_cache(_make_tree({"docs/intro.md": "# Intro v2\n"}), cache_path)
+
+    assert cache_path.read_bytes() == previous
+    assert set(read_tree_cache(cache_path).nodes) == set(CONTENTS)
+
+
+def test_rewrite_leaves_no_temp_file(cache_path):
+    write_tree_cache(_make_tree(CONTENTS), cache_path)
+    write_tree_cache(_make_tree(CONTENTS), cache_path)
+
+    assert sorted(p.name for p in cache_path.parent.iterdir() if p.is_file()) == [cache_path.name]